@@ -1,7 +1,13 @@
+import copy
+import functools
+import hashlib
 import yaml
 import os
 import logging
-from typing import Any, Dict, Optional
+import pickle  # nosec B403 - only reads the user's own cache file
+import tempfile
+import types
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 import sys
 
 # Ensure core package can be found for exceptions later, not strictly needed for this file
@@ -10,6 +16,17 @@ from .exceptions import ConfigError  # Use relative import
 
 logger = logging.getLogger(__name__)
 
+# Prefer the libyaml-backed loader; the pure-Python SafeLoader is much slower
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
+    logger.debug(
+        "libyaml bindings not available, using pure-Python YAML loader. "
+        "Reinstall PyYAML with libyaml support for faster config parsing."
+    )
+
 # Default path is relative to the project root where lahma.py runs
 DEFAULT_CONFIG_FILENAME = "config.yaml"
 CONFIG_DIR = "config"
@@ -17,134 +34,330 @@ DEFAULT_CONFIG_PATH = os.path.join(
     CONFIG_DIR, DEFAULT_CONFIG_FILENAME
 )  # e.g., config/config.yaml
 
+# Default settings, merged under whatever the config file provides.
+# Never hand this dict out directly; _deep_merge always builds a fresh copy.
+_DEFAULTS: Dict[str, Any] = {
+    # Logging Defaults (can be overridden by config file or CLI args later)
+    "logging": {
+        "level": "INFO",
+        "file": "lahma.log",  # Default log file name
+    },
+    # OpenAI Defaults (api_key comes from the config file or environment)
+    "openai": {
+        "model": "gpt-3.5-turbo",
+        "request_timeout": 60,
+    },
+    # ESXi Tester Defaults
+    "esxi_tester": {
+        "targets": [],
+        "check_timeout": 10,
+        "max_connections": 200,  # Concurrent target checks
+        "results_file": None,  # Optional JSON Lines output of per-target results
+    },
+    # Web Fuzzer Defaults
+    "web_fuzzer": {
+        "target_url": None,  # No default target
+        "target_urls": [],  # Additional targets, scanned in the same Nuclei run
+        "nuclei": {
+            "templates_path": None,  # Use Nuclei defaults if None
+            "extra_flags": "-silent",
+            "process_timeout": 600,
+            "cache_dir": None,  # Use Nuclei's default config directory if None
+            "concurrency": None,  # Targets scanned in parallel; Nuclei default if None
+        },
+    },
+    # Tor Defaults
+    "tor": {
+        "enabled": False,
+        "control_port": 9051,
+        "control_password": None,
+    },
+}
+
+# Environment variables that override config values, as (config path, env names).
+# The first non-empty variable wins. Use the LAHMA_ prefix for clarity, with
+# fallbacks to common names like OPENAI_API_KEY.
+_ENV_OVERRIDES: List[Tuple[Tuple[str, ...], Tuple[str, ...]]] = [
+    (("openai", "api_key"), ("LAHMA_OPENAI_API_KEY", "OPENAI_API_KEY")),
+    (("tor", "control_password"), ("LAHMA_TOR_CONTROL_PASSWORD",)),
+]
+
+# On-disk cache of the parsed config, keyed by the YAML file's path, mtime and size.
+# Bump CACHE_VERSION whenever the cached structure changes; changes to _DEFAULTS
+# invalidate the cache automatically through the fingerprint.
+CACHE_VERSION = 1
+_DEFAULTS_FINGERPRINT = hashlib.sha256(repr(_DEFAULTS).encode()).hexdigest()[:16]
+CONFIG_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "lahma", "config.pkl"
+)
+
+
+def _first_existing(
+    paths: Iterable[str],
+) -> Optional[Tuple[str, os.stat_result]]:
+    """Returns the first path that exists along with its stat result."""
+    for path in paths:
+        try:
+            return path, os.stat(path)
+        except OSError:  # Missing, a non-directory parent or unreadable
+            continue
+    return None
+
+
+def _scan_config_dir(
+    filenames: Iterable[str], config_dir: str = CONFIG_DIR
+) -> Optional[Tuple[str, os.stat_result]]:
+    """
+    Returns the first of `filenames` present in `config_dir` with its stat result.
+
+    The directory is listed once with os.scandir and only the chosen file is
+    stat'ed, instead of probing every candidate path separately.
+    """
+    try:
+        with os.scandir(config_dir) as it:
+            entries = {entry.name: entry for entry in it}
+    except OSError:  # Missing, not a directory or unreadable
+        return None
+    for filename in filenames:
+        entry = entries.get(filename)
+        if entry is None:
+            continue
+        try:
+            return entry.path, entry.stat()
+        except OSError:  # Removed or made unreadable since the directory was listed
+            continue
+    return None
+
 
-def find_config_file(config_path_arg: Optional[str] = None) -> Optional[str]:
-    """Finds the configuration file path to use."""
+def _locate_config_file(
+    config_path_arg: Optional[str] = None,
+    base_dir: Optional[str] = None,
+) -> Optional[Tuple[str, os.stat_result]]:
+    """Finds the configuration file to use, returning its path and stat result."""
     # 1. Explicit path from argument
     if config_path_arg:
-        if os.path.exists(config_path_arg):
-            logger.debug(f"Using config file specified via argument: {config_path_arg}")
-            return config_path_arg
-        else:
-            # If explicit path given but doesn't exist, raise error
-            raise ConfigError(
-                f"Config file specified via --config does not exist: {config_path_arg}"
+        found = _first_existing([config_path_arg])
+        if found:
+            logger.debug(
+                "Using config file specified via argument: %s", config_path_arg
             )
+            return found
+        # If explicit path given but doesn't exist, raise error
+        raise ConfigError(
+            f"Config file specified via --config does not exist: {config_path_arg}"
+        )
 
-    # 2. Default path (e.g., config/config.yaml) relative to current working dir
-    #    This assumes lahma.py is run from the project root directory.
-    if os.path.exists(DEFAULT_CONFIG_PATH):
-        logger.debug(f"Using default config file: {DEFAULT_CONFIG_PATH}")
-        return DEFAULT_CONFIG_PATH
-
+    # 2. Default path (e.g., config/config.yaml) relative to base_dir, or to the
+    #    current working dir if none is given. The latter assumes lahma.py is
+    #    run from the project root directory.
     # 3. Example config file (as a fallback to avoid errors, maybe warn?)
-    example_path = os.path.join(CONFIG_DIR, "config.example.yaml")
-    if os.path.exists(example_path):
+    config_dir = os.path.join(base_dir, CONFIG_DIR) if base_dir else CONFIG_DIR
+    default_path = os.path.join(config_dir, DEFAULT_CONFIG_FILENAME)
+    example_path = os.path.join(config_dir, "config.example.yaml")
+    found = _scan_config_dir(
+        [DEFAULT_CONFIG_FILENAME, "config.example.yaml"], config_dir
+    )
+    if found and found[0] == default_path:
+        logger.debug("Using default config file: %s", default_path)
+    elif found:
         logger.warning(
-            f"Default config file '{DEFAULT_CONFIG_PATH}' not found. "
+            f"Default config file '{default_path}' not found. "
             f"Falling back to example config: {example_path}. "
             "Please copy it to config.yaml and customize."
         )
-        return example_path
+    else:
+        # 4. No config file found
+        logger.warning(
+            f"No configuration file found at specified path, default path '{default_path}', or example path."
+        )
+    return found
+
+
+def find_config_file(
+    config_path_arg: Optional[str] = None, base_dir: Optional[str] = None
+) -> Optional[str]:
+    """
+    Finds the configuration file path to use.
+
+    Without an explicit path, config/config.yaml (then config.example.yaml) is
+    looked up under `base_dir`, defaulting to the current working directory.
+    """
+    found = _locate_config_file(config_path_arg, base_dir)
+    return found[0] if found else None
+
+
+def _read_config_file(config_file_to_load: str) -> Dict[str, Any]:
+    """Parses a YAML config file into a dictionary."""
+    try:
+        # Read as bytes so the parser handles decoding natively
+        with open(config_file_to_load, "rb") as f:
+            loaded_yaml = yaml.load(f, Loader=_YamlLoader)  # nosec B506
+    except yaml.YAMLError as e:
+        logger.error(
+            f"Error parsing YAML config file {config_file_to_load}: {e}",
+            exc_info=True,
+        )
+        raise ConfigError(f"Invalid YAML syntax in {config_file_to_load}") from e
+    except IOError as e:
+        logger.error(
+            f"Error reading config file {config_file_to_load}: {e}", exc_info=True
+        )
+        raise ConfigError(f"Cannot read config file {config_file_to_load}") from e
+    except Exception as e:
+        logger.error(
+            f"Unexpected error loading config file {config_file_to_load}: {e}",
+            exc_info=True,
+        )
+        raise ConfigError(
+            f"Unexpected error loading config {config_file_to_load}"
+        ) from e
+
+    if isinstance(loaded_yaml, dict):
+        logger.info(f"Successfully loaded configuration from: {config_file_to_load}")
+        return loaded_yaml
 
-    # 4. No config file found
+    # Handle empty or invalid YAML structure
     logger.warning(
-        f"No configuration file found at specified path, default path '{DEFAULT_CONFIG_PATH}', or example path."
+        f"Config file '{config_file_to_load}' is empty or not a valid dictionary. Using defaults."
     )
-    return None
+    return {}
 
 
-def load_config(config_path_arg: Optional[str] = None) -> Dict[str, Any]:
-    """Loads configuration from YAML, handling defaults and environment variables."""
-    config_file_to_load = find_config_file(config_path_arg)
-    config: Dict[str, Any] = {}  # Start with an empty config dictionary
+def _deep_merge(defaults: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns a new dict with overrides recursively merged over defaults.
 
-    if config_file_to_load:
-        try:
-            with open(config_file_to_load, "r") as f:
-                loaded_yaml = yaml.safe_load(f)
-                if isinstance(loaded_yaml, dict):
-                    config = loaded_yaml
-                    logger.info(
-                        f"Successfully loaded configuration from: {config_file_to_load}"
-                    )
-                else:
-                    # Handle empty or invalid YAML structure
-                    logger.warning(
-                        f"Config file '{config_file_to_load}' is empty or not a valid dictionary. Using defaults."
-                    )
-                    config = {}  # Reset to empty if file content is not a dict
-
-        except yaml.YAMLError as e:
-            logger.error(
-                f"Error parsing YAML config file {config_file_to_load}: {e}",
-                exc_info=True,
+    Values taken from defaults are copied, so the result never shares
+    mutable state with the defaults.
+    """
+    merged: Dict[str, Any] = {}
+    for key, default_value in defaults.items():
+        value = overrides.get(key)
+        if isinstance(default_value, dict):
+            # A missing or empty (null) section in YAML still gets its defaults
+            if value is None:
+                value = {}
+            merged[key] = (
+                _deep_merge(default_value, value) if isinstance(value, dict) else value
             )
-            raise ConfigError(f"Invalid YAML syntax in {config_file_to_load}") from e
-        except IOError as e:
-            logger.error(
-                f"Error reading config file {config_file_to_load}: {e}", exc_info=True
-            )
-            raise ConfigError(f"Cannot read config file {config_file_to_load}") from e
-        except Exception as e:
-            logger.error(
-                f"Unexpected error loading config file {config_file_to_load}: {e}",
-                exc_info=True,
-            )
-            raise ConfigError(
-                f"Unexpected error loading config {config_file_to_load}"
-            ) from e
-    else:
-        # No config file found, proceed with defaults and env vars only
-        logger.info(
-            "No config file loaded. Relying on defaults and environment variables."
-        )
+        elif key in overrides:
+            merged[key] = value
+        else:
+            merged[key] = copy.deepcopy(default_value)
+    for key, value in overrides.items():
+        if key not in defaults:
+            merged[key] = value
+    return merged
 
-    # --- Environment Variable Overrides & Defaults ---
-    # Use LAHMA_ prefix for clarity, or fallback to common names like OPENAI_API_KEY
 
-    # Logging Defaults (can be overridden by config file or CLI args later)
-    config.setdefault("logging", {})
-    config["logging"].setdefault("level", "INFO")
-    config["logging"].setdefault("file", "lahma.log")  # Default log file name
-
-    # OpenAI Defaults & Env Var Override
-    config.setdefault("openai", {})
-    openai_api_key_env = os.environ.get("LAHMA_OPENAI_API_KEY") or os.environ.get(
-        "OPENAI_API_KEY"
-    )
-    if openai_api_key_env:
-        config["openai"]["api_key"] = openai_api_key_env
-        logger.debug("OpenAI API key loaded from environment variable.")
-    elif not config["openai"].get("api_key"):
+def _apply_env_overrides(config: Dict[str, Any]) -> None:
+    """Overrides config values from environment variables listed in _ENV_OVERRIDES."""
+    env = os.environ
+    for config_path, env_names in _ENV_OVERRIDES:
+        value = next((env[name] for name in env_names if env.get(name)), None)
+        if value is None:
+            continue
+        section = config
+        for key in config_path[:-1]:
+            section = section.setdefault(key, {})
+        section[config_path[-1]] = value
+        logger.debug(
+            "Config value '%s' loaded from environment.", ".".join(config_path)
+        )
+
+    if not config["openai"].get("api_key"):
         # Only warn if honeypot module might actually need it later
         logger.debug(
             "OpenAI API key not found in environment variables or config file."
         )
         # We don't raise error here, let the module handle it if needed.
-    config["openai"].setdefault("model", "gpt-3.5-turbo")
-    config["openai"].setdefault("request_timeout", 60)
 
-    # ESXi Tester Defaults
-    config.setdefault("esxi_tester", {})
-    config["esxi_tester"].setdefault("targets", [])  # Default to empty list
-    config["esxi_tester"].setdefault("check_timeout", 10)
 
-    # Web Fuzzer Defaults
-    config.setdefault("web_fuzzer", {})
-    config["web_fuzzer"].setdefault("target_url", None)  # No default target
-    config["web_fuzzer"].setdefault("nuclei", {})
-    config["web_fuzzer"]["nuclei"].setdefault(
-        "templates_path", None
-    )  # Use Nuclei defaults if None
-    config["web_fuzzer"]["nuclei"].setdefault("extra_flags", "-silent")
-    config["web_fuzzer"]["nuclei"].setdefault("process_timeout", 600)
+def _read_cached_config(cache_key: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+    """Returns the cached config for cache_key, or None on a miss."""
+    try:
+        with open(CONFIG_CACHE_PATH, "rb") as f:
+            cached_key, cached_config = pickle.load(f)  # nosec B301
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # A corrupt or incompatible cache is never fatal, just reparse the YAML
+        logger.debug("Ignoring unreadable config cache %s: %s", CONFIG_CACHE_PATH, e)
+        return None
 
-    # Tor Defaults
-    config.setdefault("tor", {})
-    config["tor"].setdefault("enabled", False)
-    config["tor"].setdefault("control_port", 9051)
-    config["tor"].setdefault("control_password", None)
+    if cached_key != cache_key or not isinstance(cached_config, dict):
+        return None
+    logger.debug("Using cached configuration from: %s", CONFIG_CACHE_PATH)
+    return cached_config
+
+
+def _write_cached_config(cache_key: Tuple[Any, ...], config: Dict[str, Any]) -> None:
+    """Atomically stores config in the on-disk cache (best effort)."""
+    cache_dir = os.path.dirname(CONFIG_CACHE_PATH)
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # mkstemp creates the file with 0600 permissions; config may hold secrets
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((cache_key, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, CONFIG_CACHE_PATH)
+    except Exception as e:
+        logger.debug("Could not write config cache %s: %s", CONFIG_CACHE_PATH, e)
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _config_cache_key(path: str, st: os.stat_result) -> Tuple[Any, ...]:
+    """Builds the cache key for a config file; it changes whenever the file does."""
+    return (
+        CACHE_VERSION,
+        _DEFAULTS_FINGERPRINT,
+        os.path.abspath(path),
+        st.st_mtime_ns,
+        st.st_size,
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(cache_key: Tuple[Any, ...]) -> Mapping[str, Any]:
+    """Loads the config file identified by cache_key, merged with defaults.
+
+    Memoized per process; the key changes whenever the file is modified.
+    The returned mapping is shared and read-only; callers get a deep copy.
+    """
+    config = _read_cached_config(cache_key)
+    if config is None:
+        config = _deep_merge(_DEFAULTS, _read_config_file(cache_key[2]))
+        _write_cached_config(cache_key, config)
+    return types.MappingProxyType(config)
+
+
+def load_config(
+    config_path_arg: Optional[str] = None, base_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Loads configuration from YAML, handling defaults and environment variables.
+
+    Parsing uses libyaml (yaml.CSafeLoader) when PyYAML was built with it and
+    falls back to the much slower pure-Python loader otherwise. `base_dir` is
+    passed to find_config_file.
+    """
+    found = _locate_config_file(config_path_arg, base_dir)
+    config: Dict[str, Any]
+
+    if found:
+        # The caches hold the file contents merged with defaults. Environment
+        # overrides are applied afterwards so they always reflect the current env.
+        cache_key = _config_cache_key(*found)
+        config = copy.deepcopy(dict(_load_config_cached(cache_key)))
+    else:
+        # No config file found, proceed with defaults and env vars only
+        logger.info(
+            "No config file loaded. Relying on defaults and environment variables."
+        )
+        config = _deep_merge(_DEFAULTS, {})
+
+    _apply_env_overrides(config)
 
     logger.debug("Configuration loading complete.")
     # logger.debug(f"Final config object (excluding sensitive values potentially): {config}") # Be careful logging config
@@ -152,6 +365,9 @@ def load_config(config_path_arg: Optional[str] = None) -> Dict[str, Any]:
     return config
 
 
+load_config.cache_clear = _load_config_cached.cache_clear  # type: ignore[attr-defined]
+
+
 # Example usage (will be called from lahma.py)
 # cfg = load_config()
 # print(cfg.get('logging', {}).get('level'))
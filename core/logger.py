@@ -1,65 +1,110 @@
+import functools
 import logging
-import sys
+import logging.config
 import os
-from typing import Union  # Added Union
+from typing import Any, Dict, Union  # Added Union
 
-# Determine a writable directory for logs, default to project root if possible
-LOG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Project root
+
+@functools.cache
+def project_root() -> str:
+    """Returns the project root, the default directory for relative log paths."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # When running from a zipapp the "root" is the archive itself; use its directory
+    if os.path.isfile(root):
+        root = os.path.dirname(root)
+    return root
+
+
+def _build_logging_config(
+    log_level: int, log_format: str, log_file_path: Union[str, None]
+) -> Dict[str, Any]:
+    """Builds the dictConfig schema for console (and optional file) logging."""
+    handlers: Dict[str, Any] = {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "default",
+            "stream": "ext://sys.stdout",
+        }
+    }
+    if log_file_path:
+        handlers["file"] = {
+            "class": "logging.FileHandler",
+            "formatter": "default",
+            "filename": log_file_path,
+            "mode": "a",
+        }
+
+    return {
+        "version": 1,
+        # Keep loggers created at import time (e.g. modules.*) working
+        "disable_existing_loggers": False,
+        "formatters": {"default": {"format": log_format}},
+        "handlers": handlers,
+        # Set levels for noisy libraries
+        "loggers": {
+            "urllib3": {"level": "WARNING"},
+            "pyVim": {"level": "INFO"},  # pyVmomi can be noisy
+            "pyVmomi": {"level": "INFO"},
+        },
+        "root": {"level": log_level, "handlers": list(handlers)},
+    }
 
 
 # Changed type hint to use Union[str, None]
 def setup_logging(
     log_level_str: str = "INFO", log_file_name: Union[str, None] = "lahma.log"
-):
-    """Configures logging for the application."""
-    log_level = getattr(logging, log_level_str.upper(), logging.INFO)
+) -> Union[str, None]:
+    """
+    Configures logging for the application.
 
-    # Basic configuration sets up console logging
-    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    # Ensure existing handlers are removed before basicConfig if re-configuring
-    # But basicConfig replaces handlers anyway, so this setup sequence is okay.
-    logging.basicConfig(
-        level=log_level, format=log_format, stream=sys.stdout, force=True
-    )
+    Args:
+        log_level_str: Name of the root log level (e.g. "INFO").
+        log_file_name: Log file path, absolute or relative to the project root.
+            None logs to the console only.
 
-    root_logger = logging.getLogger()  # Get root logger AFTER basicConfig
+    Returns:
+        The absolute path of the log file actually in use, or None if logging
+        to the console only.
+    """
+    log_level = getattr(logging, log_level_str.upper(), logging.INFO)
+    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-    # File Handler (Optional)
+    # Let FileHandler's own open() be the writability check: try the project
+    # directory first, then the home directory, then fall back to console only.
+    candidate_paths = []
     if log_file_name:
-        log_file_path = os.path.join(LOG_DIR, log_file_name)
-        try:
-            # Check if directory is writable, fallback if needed (though LOG_DIR should be okay)
-            if not os.access(LOG_DIR, os.W_OK):
-                alt_log_dir = os.path.expanduser("~")  # Fallback to home directory
-                if os.access(alt_log_dir, os.W_OK):
-                    log_file_path = os.path.join(alt_log_dir, log_file_name)
-                    logging.warning(
-                        f"Project directory not writable, attempting to log to: {log_file_path}"
-                    )
-                else:
-                    raise OSError("Log directory not writable.")
+        candidate_paths = [
+            os.path.join(project_root(), log_file_name),
+            os.path.join(os.path.expanduser("~"), os.path.basename(log_file_name)),
+        ]
 
-            file_handler = logging.FileHandler(log_file_path, mode="a")
-            file_handler.setFormatter(logging.Formatter(log_format))
-            # Add file handler IN ADDITION to console handler from basicConfig
-            root_logger.addHandler(file_handler)
-            logging.info(
-                f"Logging configured with level {log_level_str}. Output also sent to: {log_file_path}"
+    log_file_path: Union[str, None] = None
+    failures = []
+    for candidate in candidate_paths:
+        try:
+            # Replaces any previously configured root handlers in one step
+            logging.config.dictConfig(
+                _build_logging_config(log_level, log_format, candidate)
             )
+        except ValueError as e:
+            # dictConfig wraps handler construction errors in ValueError
+            if not isinstance(e.__cause__, OSError):
+                raise
+            failures.append(f"{candidate}: {e.__cause__}")
+            continue
+        log_file_path = candidate
+        break
+    else:
+        logging.config.dictConfig(_build_logging_config(log_level, log_format, None))
 
-        except Exception as e:
-            logging.error(
-                f"Failed to set up file logging to {log_file_path}: {e}", exc_info=True
-            )
-            logging.info(
-                f"Logging configured with level {log_level_str}. Output to console only."
-            )
+    for failure in failures:
+        logging.warning(f"Failed to set up file logging to {failure}")
+    if log_file_path:
+        logging.info(
+            f"Logging configured with level {log_level_str}. Output also sent to: {log_file_path}"
+        )
     else:
         logging.info(
             f"Logging configured with level {log_level_str}. Output to console only."
         )
-
-    # Set levels for noisy libraries if needed (example)
-    logging.getLogger("urllib3").setLevel(logging.WARNING)
-    logging.getLogger("pyVim").setLevel(logging.INFO)  # pyVmomi can be noisy
-    logging.getLogger("pyVmomi").setLevel(logging.INFO)
+    return log_file_path
@@ -1,15 +1,16 @@
 #!/usr/bin/env python3
-import click
+import argparse
+import importlib
 import logging
 import sys
 import os
-from typing import Union, Optional, Dict, Any  # Added Union, Optional etc.
+from typing import Any, Dict, List, Optional, Union  # Added Union, Optional etc.
 
 # Ensure the core package is importable if running as a script
 # (though activating venv usually handles this for installed packages)
 # sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from core.logger import setup_logging
+from core.logger import setup_logging, project_root
 from core.config import load_config, DEFAULT_CONFIG_PATH
 from core.exceptions import (
     LahMaError,
@@ -19,62 +20,79 @@ from core.exceptions import (
     EnvironmentError,
 )
 
-# --- Module Imports ---
-# Removed the try...except blocks and dummy functions
-# These will now raise ImportError if a module file is missing/broken,
-# which is acceptable during development.
-from modules.honeypot import run as run_honeypot
-from modules.esxi_tester import run as run_esxi_tests
-from modules.web_fuzzer import run as run_web_fuzzer
-
-# --- End Module Imports ---
+# --- Module Registry ---
+# Modules are imported lazily in run_module so each invocation only pays the
+# import cost (pyVmomi, OpenAI SDK, ...) of the module it actually runs.
+MODULE_MAP: Dict[str, str] = {
+    "honeypot": "modules.honeypot",
+    "esxi": "modules.esxi_tester",
+    "fuzz": "modules.web_fuzzer",
+}
+# --- End Module Registry ---
 
 
 # Get a logger for the main script itself
 logger = logging.getLogger("lahma_cli")
 
 
-# Define the main command group
-@click.group()
-@click.version_option(version="0.1.0", prog_name="LahMa")  # Add a version option
-@click.option(
-    "--config",
-    "-c",
-    type=click.Path(dir_okay=False),  # File must exist handled by load_config logic
-    default=None,  # Let load_config find default if None
-    help=f"Path to the configuration file (default: {DEFAULT_CONFIG_PATH} if found).",
-)
-@click.option(
-    "--log-level",
-    type=click.Choice(
-        ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], case_sensitive=False
-    ),
-    default=None,  # Will be merged with config
-    help="Override log level from config file.",
-)
-@click.option(
-    "--log-file",
-    type=click.Path(dir_okay=False),  # Allow specifying a log file path
-    default=None,  # Will be merged with config
-    help="Override log file path from config file. Use 'NONE' for console only.",
-)
-@click.pass_context  # Pass context to subcommands if needed later, good practice
+LOG_LEVEL_CHOICES = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the command-line parser for the LahMa CLI."""
+    parser = argparse.ArgumentParser(
+        prog="lahma",
+        description=(
+            "🚀 LahMa: Modular Security Toolkit. "
+            "Run modules using commands like 'lahma run honeypot'."
+        ),
+    )
+    parser.add_argument(
+        "--version", action="version", version="LahMa, version 0.1.0"
+    )  # Add a version option
+    parser.add_argument(
+        "--config",
+        "-c",
+        default=None,  # Let load_config find default if None
+        help=f"Path to the configuration file (default: {DEFAULT_CONFIG_PATH} if found).",
+    )
+    parser.add_argument(
+        "--log-level",
+        type=str.upper,  # Case-insensitive, like the previous click.Choice
+        choices=LOG_LEVEL_CHOICES,
+        default=None,  # Will be merged with config
+        help="Override log level from config file.",
+    )
+    parser.add_argument(
+        "--log-file",
+        default=None,  # Will be merged with config
+        help="Override log file path from config file. Use 'NONE' for console only.",
+    )
+
+    subparsers = parser.add_subparsers(dest="cmd", metavar="COMMAND")
+    # Define a subcommand for running modules
+    run_parser = subparsers.add_parser(
+        "run",
+        help="Runs the specified LahMa module.",
+        description="Runs the specified LahMa module.",
+    )
+    run_parser.add_argument("mode", type=str.lower, choices=list(MODULE_MAP))
+    return parser
+
+
 # Changed type hints to use Optional[]
-def cli(ctx, config: Optional[str], log_level: Optional[str], log_file: Optional[str]):
+def cli(
+    config: Optional[str], log_level: Optional[str], log_file: Optional[str]
+) -> Dict[str, Any]:
     """
-    🚀 LahMa: Modular Security Toolkit
+    Loads the configuration and sets up logging for a CLI invocation.
 
-    Run modules using commands like 'lahma run honeypot'.
-    Use --help with a command for module-specific options if added later.
+    Returns:
+        The loaded configuration, to be passed to the selected module.
     """
-    ctx.ensure_object(
-        dict
-    )  # Ensure ctx.obj exists for storing shared objects like config
-
     try:
         # 1. Load Configuration (will raise ConfigError if --config path is bad)
         cfg = load_config(config)
-        ctx.obj["CONFIG"] = cfg  # Store loaded config in context
 
         # 2. Determine effective logging settings (CLI overrides config)
         # Handle explicit "NONE" for log file override
@@ -89,55 +107,55 @@ def cli(ctx, config: Optional[str], log_level: Optional[str], log_file: Optional
         final_log_level = log_level or cfg.get("logging", {}).get("level", "INFO")
 
         # 3. Setup Logging (MUST happen after config load)
-        # Pass the resolved filename, not the path override string
-        setup_logging(final_log_level, final_log_file_name)  # Pass name or None
+        # Relative log file names are resolved against the project root once here
+        log_file_path = (
+            os.path.join(project_root(), final_log_file_name)
+            if final_log_file_name
+            else None
+        )
+        log_file_path = setup_logging(final_log_level, log_file_path)
         logger.info(f"LahMa CLI initialized. Log level: {final_log_level}.")
-        if final_log_file_name:
-            # Construct full path for logging message if file handler was added
-            log_file_path = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), final_log_file_name)
-            )  # Assuming relative to project root
+        if log_file_path:
             logger.info(f"Logging to file: {log_file_path}")
         logger.debug("CLI arguments processed.")
-        # Avoid logging full config at INFO level if it contains secrets
-        logger.debug(f"Loaded configuration object: {cfg}")
+        # Avoid logging full config at INFO level if it contains secrets.
+        # Guarded so the nested dict is only stringified when DEBUG is on.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Loaded configuration object: %s", cfg)
+        return cfg
 
     except ConfigError as e:
         # Log configuration errors specifically before exiting
         # Logging might not be fully set up yet if config loading failed early
         # so also print to stderr.
         logging.error(f"Configuration Error: {e}", exc_info=False)  # Use basic logging
-        click.echo(f"Error: Configuration failed - {e}", err=True)
+        print(f"Error: Configuration failed - {e}", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
         # Catch unexpected errors during setup
         logging.critical(
             f"Critical error during CLI initialization: {e}", exc_info=True
         )
-        click.echo(f"Error: Critical initialization failed - {e}", err=True)
+        print(f"Error: Critical initialization failed - {e}", file=sys.stderr)
         sys.exit(1)
 
 
-# Define a subcommand group for running modules
-@cli.command(name="run")
-@click.argument(
-    "mode", type=click.Choice(["honeypot", "esxi", "fuzz"], case_sensitive=False)
-)
-@click.pass_context  # Get config from context
-def run_module(ctx, mode: str):
+def run_module(cfg: Dict[str, Any], mode: str):
     """Runs the specified LahMa module."""
-    cfg = ctx.obj["CONFIG"]  # Retrieve config from context
     logger.info(f"Attempting to run module: {mode}")
 
-    module_map: Dict[str, Any] = {  # Added type hint for clarity
-        "honeypot": run_honeypot,
-        "esxi": run_esxi_tests,
-        "fuzz": run_web_fuzzer,
-    }
+    module_path = MODULE_MAP.get(mode.lower())
 
-    run_function = module_map.get(mode)
+    if module_path:
+        try:
+            run_function = importlib.import_module(module_path).run
+        except (ImportError, AttributeError) as e:
+            logger.critical(
+                f"Failed to load module '{mode}' ({module_path}): {e}", exc_info=True
+            )
+            print(f"Error: Could not load module '{mode}': {e}", file=sys.stderr)
+            sys.exit(1)
 
-    if run_function:
         try:
             logger.info(f"Executing {mode} module...")
             run_function(cfg)  # Pass the loaded config to the module's run function
@@ -147,7 +165,7 @@ def run_module(ctx, mode: str):
             logger.error(
                 f"Error during '{mode}' module execution: {e}", exc_info=False
             )  # Less verbose logging for known errors
-            click.echo(f"Error: {e}", err=True)
+            print(f"Error: {e}", file=sys.stderr)
             sys.exit(1)
         except Exception as e:
             # Catch unexpected errors within a module
@@ -155,20 +173,27 @@ def run_module(ctx, mode: str):
                 f"An unexpected critical error occurred in the '{mode}' module: {e}",
                 exc_info=True,
             )
-            click.echo(f"Error: An unexpected critical error occurred: {e}", err=True)
+            print(f"Error: An unexpected critical error occurred: {e}", file=sys.stderr)
             sys.exit(1)
     else:
-        # This should ideally be caught by click.Choice, but good to have
+        # This should ideally be caught by argparse choices, but good to have
         logger.error(f"Selected mode '{mode}' does not match any known module.")
-        click.echo(f"Error: Invalid mode '{mode}'.", err=True)
+        print(f"Error: Invalid mode '{mode}'.", file=sys.stderr)
         sys.exit(1)
 
 
-# Entry point for script execution
-if __name__ == "__main__":
-    # Add a top-level try-except just in case something fails before Click takes over
+def main(argv: Optional[List[str]] = None):
+    """Console entry point (also used as the zipapp entry, see build_zipapp.py)."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.cmd is None:
+        # No subcommand given: show usage, like a bare command group would
+        parser.print_help()
+        return
+
+    # Add a top-level try-except just in case something fails before the CLI is set up
     try:
-        cli(obj={})  # Pass initial empty object for context
+        cfg = cli(args.config, args.log_level, args.log_file)
     except Exception as e:
         # Fallback logging/printing if error happens extremely early
         print(
@@ -177,3 +202,11 @@ if __name__ == "__main__":
         )
         # Consider basic logging setup here if needed for very early errors
         sys.exit(1)
+
+    if args.cmd == "run":
+        run_module(cfg, args.mode)
+
+
+# Entry point for script execution
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,42 @@
+import asyncio
+import errno
+import functools
+import importlib.util
+import inspect
+import json
 import logging
+import os
+import re
+import select
 import ssl
 import socket
-from typing import Dict, Any, List, Tuple
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, FrozenSet, List, Optional, Sequence, Tuple
 
-# Import pyVmomi libraries
 try:
-    from pyVim import connect
-    from pyVmomi import vim, vmodl
-
-    PYVMOMI_AVAILABLE = True
+    import resource  # Unix only; used to respect the open-file limit
 except ImportError:
-    PYVMOMI_AVAILABLE = False
+    resource = None  # type: ignore[assignment]
+
+# pyVmomi is imported lazily by _load_pyvmomi(): it pulls in the whole SOAP stub
+# and type system, which other LahMa commands should not pay for.
+PYVMOMI_AVAILABLE = (
+    importlib.util.find_spec("pyVmomi") is not None
+    and importlib.util.find_spec("pyVim") is not None
+)
+if not PYVMOMI_AVAILABLE:
     # Removed dummy class definitions - rely on PYVMOMI_AVAILABLE check
     print("WARNING: pyVmomi library not found. ESXi module will fail if used.")
 
+# Populated by _load_pyvmomi()
+connect: Any = None
+vmodl: Any = None
+_SMARTCONNECT_PARAMS: FrozenSet[str] = frozenset()
+SMARTCONNECT_HAS_TIMEOUTS = False
+_pyvmomi_lock = threading.Lock()
+
 
 # Import LahMa specific exceptions
 try:
@@ -29,56 +52,253 @@ except ImportError:
 
 logger = logging.getLogger(__name__)  # Gets logger named "modules.esxi_tester"
 
+# Target entries: "host", "host:port", "[ipv6]" or "[ipv6]:port"
+_TARGET_RE = re.compile(r"(?P<host>\[[^\]]+\]|[^:\[\]]+)(?::(?P<port>\d{1,5}))?")
+
+# setsockopt option number of TCP_USER_TIMEOUT on Linux (not exposed before Python 3.6)
+_TCP_USER_TIMEOUT = getattr(socket, "TCP_USER_TIMEOUT", 18)
+
+# File descriptors kept free for the rest of the process when sizing concurrency
+_RESERVED_FDS = 64
+
+
+def _create_unverified_ssl_context():
+    """Creates the SSL context used for all checks (certificate verification off)."""
+    try:
+        if hasattr(ssl, "_create_unverified_context"):
+            return ssl._create_unverified_context()  # nosec B323
+    except Exception as e:
+        logger.warning("Could not prepare SSL context: %s", e)
+    return None
+
+
+# A connection is force-closed once it has been open this many check timeouts
+_CONNECTION_LIFETIME_FACTOR = 2
+# Number of connections force-closed by the reaper (see _reap_connection)
+_reaped_connections = 0
+_reaped_lock = threading.Lock()
+
+# Ignore certificate verification for the safe checks. Built once and shared by
+# every connection, since creating an SSLContext loads the CA bundle each time.
+_UNVERIFIED_SSL_CONTEXT = _create_unverified_ssl_context()
+
+
+def _pyvmomi_unavailable(
+    host: str, port: int, timeout: int, addresses: Optional[Sequence[str]] = None
+) -> Tuple[bool, str]:
+    """Stand-in for check_esxi_target when pyVmomi is not installed."""
+    raise EnvironmentError(
+        "pyVmomi library is required for the ESXi module but is not installed/found."
+    )
 
-def check_esxi_target(host: str, port: int, timeout: int) -> Tuple[bool, str]:
+
+def _load_pyvmomi() -> None:
+    """Imports pyVmomi on first use and records which SmartConnect options it has."""
+    global connect, vmodl, _SMARTCONNECT_PARAMS, SMARTCONNECT_HAS_TIMEOUTS
+    if connect is not None:
+        return
+    with _pyvmomi_lock:
+        if connect is not None:
+            return
+        from pyVim import connect as pyvim_connect
+        from pyVmomi import vmodl as pyvmomi_vmodl
+
+        # pyVmomi >= 8.0.0.1 accepts per-connection timeouts; older releases only
+        # honour the process-wide socket default timeout.
+        _SMARTCONNECT_PARAMS = frozenset(
+            inspect.signature(pyvim_connect.SmartConnect).parameters
+        )
+        SMARTCONNECT_HAS_TIMEOUTS = "httpConnectionTimeout" in _SMARTCONNECT_PARAMS
+        vmodl = pyvmomi_vmodl
+        connect = pyvim_connect
+
+
+def _tcp_probe(host: str, port: int, timeout: int) -> Tuple[bool, str]:
+    """
+    Checks that a TCP connection to host:port can be established.
+
+    A plain TCP handshake is far cheaper than a TLS + SOAP round-trip, so
+    closed or filtered ports are ruled out before calling SmartConnect.
+
+    Returns:
+        A tuple (open: bool, reason: str); reason describes why the probe failed.
+
+    Raises:
+        socket.gaierror: If the host name cannot be resolved.
+    """
+    if sys.platform == "linux":
+        return _tcp_probe_linux(host, port, timeout)
+    try:
+        probe = socket.create_connection((host, port), timeout=timeout)
+    except socket.gaierror:
+        raise
+    except (socket.timeout, TimeoutError):
+        return False, f"TCP connect timed out after {timeout} seconds"
+    except OSError as e:
+        return False, f"{e.__class__.__name__}: {e}"
+    probe.close()
+    return True, ""
+
+
+def _tcp_probe_linux(host: str, port: int, timeout: int) -> Tuple[bool, str]:
+    """
+    Linux variant of _tcp_probe using a non-blocking socket and epoll.
+
+    TCP_USER_TIMEOUT caps how long the kernel keeps retransmitting unanswered
+    packets, so filtered hosts are abandoned after `timeout` instead of the
+    default SYN retry chain (~60s).
+    """
+    family, _, _, _, sockaddr = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[
+        0
+    ]
+    try:
+        probe = socket.socket(
+            family, socket.SOCK_STREAM | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC
+        )
+    except OSError as e:
+        return False, f"{e.__class__.__name__}: {e}"
+    try:
+        probe.setsockopt(socket.IPPROTO_TCP, _TCP_USER_TIMEOUT, int(timeout * 1000))
+        err = probe.connect_ex(sockaddr)
+        if err == errno.EINPROGRESS:
+            poller = select.epoll(1)
+            try:
+                poller.register(probe.fileno(), select.EPOLLOUT)
+                if not poller.poll(timeout):
+                    return False, f"TCP connect timed out after {timeout} seconds"
+            finally:
+                poller.close()
+            err = probe.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err:
+            # OSError(errno, ...) maps to the matching subclass (ConnectionRefusedError, ...)
+            raise OSError(err, os.strerror(err))
+    except OSError as e:
+        return False, f"{e.__class__.__name__}: {e}"
+    finally:
+        probe.close()
+    return True, ""
+
+
+def _first_open_address(
+    addresses: Sequence[str], port: int, timeout: int
+) -> Tuple[Optional[str], str]:
+    """
+    Probes each address in turn, like socket.create_connection does.
+
+    Returns:
+        A tuple (address, reason): the first address whose port is open, or
+        None and the reason the last address failed.
+    """
+    reason = "no addresses to probe"
+    for address in addresses:
+        port_open, reason = _tcp_probe(address, port, timeout)
+        if port_open:
+            return address, ""
+        logger.debug("TCP probe of %s port %s failed: %s", address, port, reason)
+    return None, reason
+
+
+def _drop_connections(service_instance: Any) -> bool:
+    """Closes all pooled sockets of a pyVmomi connection. Returns True on success."""
+    stub = getattr(service_instance, "_stub", None)
+    drop = getattr(stub, "DropConnections", None)
+    if drop is None:
+        return False
+    try:
+        drop()
+        return True
+    except Exception as e:
+        logger.debug("Failed to drop pooled connections: %s", e)
+        return False
+
+
+def _reap_connection(service_instance: Any, target: str) -> None:
+    """Force-closes a connection that outlived its lifetime (runs on a timer)."""
+    global _reaped_connections
+    if _drop_connections(service_instance):
+        with _reaped_lock:
+            _reaped_connections += 1
+        logger.warning(
+            "Reaped connection to %s after it exceeded its lifetime.", target
+        )
+
+
+def check_esxi_target(
+    host: str, port: int, timeout: int, addresses: Optional[Sequence[str]] = None
+) -> Tuple[bool, str]:
     """
     Performs a safe check on a potential ESXi host.
 
-    Attempts to connect using pyVmomi and retrieve basic info.
+    Probes the TCP port first, then attempts to connect using pyVmomi and
+    retrieve basic info.
 
     Args:
         host: The IP address or hostname of the target.
         port: The port to connect to (usually 443).
         timeout: Connection timeout in seconds.
+        addresses: The resolved addresses of host, tried in order; resolved
+            here if not given. pyVmomi connects to the first one that answers.
 
     Returns:
         A tuple (success: bool, message: str).
         success is True if connection and info retrieval succeeded.
         message provides details (version info or error).
     """
-    if not PYVMOMI_AVAILABLE:
-        # This check prevents NameErrors if pyVmomi failed to import
-        raise EnvironmentError(
-            "pyVmomi library is required for the ESXi module but is not installed/found."
-        )
+    _load_pyvmomi()
 
-    logger.info(f"Checking ESXi target: {host}:{port} (Timeout: {timeout}s)")
+    target = f"{host}:{port}"  # Becomes "host:port (address)" once one answers
     service_instance = None
-    original_timeout = socket.getdefaulttimeout()
-    socket.setdefaulttimeout(timeout)  # Set socket timeout for pyVmomi connection
+    reaper = None
 
-    # Prepare SSL context - Ignore certificate verification for initial check
-    context = None
-    try:
-        if hasattr(ssl, "_create_unverified_context"):
-            context = ssl._create_unverified_context()  # nosec B323
-    except Exception as e:
-        logger.warning(f"Could not prepare SSL context: {e}")
+    # Pass timeouts per connection rather than through socket.setdefaulttimeout,
+    # which is process-global and races when targets are checked concurrently.
+    timeout_kwargs: Dict[str, Any] = {
+        name: timeout
+        for name in ("httpConnectionTimeout", "connectionPoolTimeout")
+        if name in _SMARTCONNECT_PARAMS
+    }
 
     try:
-        # Attempt to connect using SmartConnect
+        addresses = addresses or _resolve_host(host)
+        logger.info(
+            "Checking ESXi target: %s (%s) (Timeout: %ss)",
+            target,
+            ", ".join(addresses),
+            timeout,
+        )
+        address, reason = _first_open_address(addresses, port, timeout)
+        if address is None:
+            message = f"TCP port closed/filtered ({reason})"
+            logger.warning("%s Target: %s", message, target)
+            return False, message
+        target = f"{target} ({address})" if address != host else target
+
+        # Attempt to connect using SmartConnect, to the address that answered
         service_instance = connect.SmartConnect(
-            host=host,
+            host=address,
             port=port,
             user="",  # Dummy user
             pwd="",  # Dummy password
-            sslContext=context,  # Ignore SSL cert validation / Use created context
+            sslContext=_UNVERIFIED_SSL_CONTEXT,  # Ignore SSL cert validation
+            **timeout_kwargs,
         )
 
         if service_instance:
+            # Bound the connection's lifetime: if the checks below (or Disconnect)
+            # hang, force-close its sockets so file descriptors are not leaked.
+            reaper = threading.Timer(
+                timeout * _CONNECTION_LIFETIME_FACTOR,
+                _reap_connection,
+                args=(service_instance, target),
+            )
+            reaper.daemon = True
+            reaper.start()
+
+            # Fetch the ServiceContent once; every `.content` access is an RPC
+            content = service_instance.RetrieveContent()
+            about_info = content.about if content else None
             # Ensure we have content before accessing attributes
-            if service_instance.content and service_instance.content.about:
-                about_info = service_instance.content.about
+            if about_info:
                 version = about_info.version
                 product_name = about_info.fullName
                 api_version = about_info.apiVersion
@@ -102,29 +322,30 @@ def check_esxi_target(host: str, port: int, timeout: int) -> Tuple[bool, str]:
         # Specific VMware errors (e.g., authentication failure)
         # Check if it's the expected type before accessing e.msg
         message = (
-            f"VMware API error: {e.msg}"
+            f"VMware API error ({e.__class__.__name__}): {e.msg}"
             if hasattr(e, "msg")
-            else f"VMware API error: {e}"
+            else f"VMware API error ({e.__class__.__name__}): {e}"
         )
-        logger.error(f"Failed to check {host}:{port} - {message}", exc_info=True)
+        # Expected for live hosts (e.g. login refused); a traceback adds nothing
+        logger.error("Failed to check %s - %s", target, message)
         return False, message
-    except (socket.timeout, TimeoutError) as e:
+    except (socket.timeout, TimeoutError):
         message = f"Connection timed out after {timeout} seconds."
-        logger.warning(f"{message} Target: {host}:{port}")
+        logger.warning("%s Target: %s", message, target)
         return False, message
     except (socket.gaierror, socket.herror) as e:
         message = f"DNS resolution error: {e}"
-        logger.error(f"{message} Target: {host}")
+        logger.error("%s Target: %s", message, host)
         return False, message
     except (ConnectionRefusedError, OSError) as e:
         # Handle cases where port is closed or host is unreachable
-        message = f"Connection error: {e}"
-        logger.warning(f"{message} Target: {host}:{port}")
+        message = f"Connection error ({e.__class__.__name__}): {e}"
+        logger.warning("%s Target: %s", message, target)
         return False, message
     except Exception as e:
         # Catch other unexpected pyVmomi or general errors
         message = f"An unexpected error occurred during connection: {e.__class__.__name__}: {e}"
-        logger.error(f"Error details - Target: {host}:{port}", exc_info=True)
+        logger.error("Error details - Target: %s", target, exc_info=True)
         return False, message
 
     finally:
@@ -132,13 +353,156 @@ def check_esxi_target(host: str, port: int, timeout: int) -> Tuple[bool, str]:
         if service_instance:
             try:
                 connect.Disconnect(service_instance)
-                logger.debug(f"Disconnected from {host}:{port}")
+                logger.debug("Disconnected from %s", target)
             except Exception as e:
                 logger.warning(
-                    f"Failed to disconnect from {host}:{port}: {e}", exc_info=True
+                    "Failed to disconnect from %s: %s: %s",
+                    target,
+                    e.__class__.__name__,
+                    e,
+                )
+            if reaper:
+                reaper.cancel()
+            # Disconnect only logs out; close the pooled sockets now rather than
+            # leaving them in CLOSE_WAIT until garbage collection.
+            _drop_connections(service_instance)
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_host(host: str) -> Tuple[str, ...]:
+    """
+    Resolves a host name to all of its IP addresses, in getaddrinfo order
+    (cached for the life of the process).
+
+    Raises:
+        socket.gaierror: If the host name cannot be resolved.
+    """
+    infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    return tuple(dict.fromkeys(sockaddr[0] for *_, sockaddr in infos))
+
+
+def _effective_concurrency(max_connections: int, target_count: int) -> int:
+    """Caps the number of concurrent checks by target count and open-file limit."""
+    concurrency = max(1, min(int(max_connections), target_count))
+    if resource is not None:
+        soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft_limit != resource.RLIM_INFINITY:
+            # Leave headroom for log files, pipes, etc. held by the process
+            fd_budget = max(1, soft_limit - _RESERVED_FDS)
+            if concurrency > fd_budget:
+                logger.warning(
+                    "Limiting concurrency to %d (open file limit is %d).",
+                    fd_budget,
+                    soft_limit,
                 )
-        # Restore original socket timeout
-        socket.setdefaulttimeout(original_timeout)
+                concurrency = fd_budget
+    return concurrency
+
+
+def _install_uvloop() -> None:
+    """Switches asyncio to uvloop's faster event loop when uvloop is installed."""
+    try:
+        import uvloop  # Optional dependency
+    except ImportError:
+        return
+    if not isinstance(asyncio.get_event_loop_policy(), uvloop.EventLoopPolicy):
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.debug("Using uvloop event loop for ESXi checks.")
+
+
+async def _check_targets(
+    checks: List[Tuple[Any, str, int]], timeout: int, concurrency: int
+) -> Dict[Any, Tuple[bool, str]]:
+    """
+    Runs check_esxi_target for all targets concurrently.
+
+    The blocking pyVmomi calls run in worker threads, at most `concurrency`
+    at a time, so one unreachable host no longer delays the others.
+
+    Returns:
+        A dict mapping each target entry to its (success, message) result,
+        in the same order as `checks`.
+    """
+    loop = asyncio.get_running_loop()
+    # Size the default executor so asyncio.to_thread can actually reach `concurrency`
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="esxi-check")
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _resolve(host: str) -> Any:
+        async with semaphore:
+            return await asyncio.to_thread(_resolve_host, host)
+
+    # Resolve each distinct host name once, so duplicate hosts (e.g. several
+    # ports on one server) do not repeat DNS queries.
+    hosts = list(dict.fromkeys(host for _, host, _ in checks))
+    addresses = await asyncio.gather(
+        *(_resolve(host) for host in hosts), return_exceptions=True
+    )
+    resolved = dict(zip(hosts, addresses))
+
+    async def _check(host: str, port: int) -> Tuple[bool, str]:
+        host_addresses = resolved[host]
+        if isinstance(host_addresses, (socket.gaierror, socket.herror)):
+            logger.error("DNS resolution error: %s Target: %s", host_addresses, host)
+            return False, f"DNS resolution error: {host_addresses}"
+        if isinstance(host_addresses, BaseException):
+            raise host_addresses
+        async with semaphore:
+            return await asyncio.to_thread(
+                check_esxi_target, host, port, timeout, host_addresses
+            )
+
+    outcomes = await asyncio.gather(
+        *(_check(host, port) for _, host, port in checks), return_exceptions=True
+    )
+
+    results: Dict[Any, Tuple[bool, str]] = {}
+    for (target_entry, _, _), outcome in zip(checks, outcomes):
+        if isinstance(outcome, BaseException):
+            # Catch unexpected errors from the check function itself
+            logger.critical(
+                "Unexpected error while processing target %s: %s",
+                target_entry,
+                outcome,
+                exc_info=outcome,
+            )
+            results[target_entry] = (False, f"Critical unexpected error: {outcome}")
+        else:
+            results[target_entry] = outcome
+    return results
+
+
+def _write_results_file(path: str, results: Dict[Any, Tuple[bool, str]]) -> None:
+    """Writes one JSON object per target to path (JSON Lines)."""
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            for target, (success, message) in results.items():
+                f.write(
+                    json.dumps(
+                        {"target": str(target), "success": success, "message": message}
+                    )
+                )
+                f.write("\n")
+    except OSError as e:
+        raise EsxiTesterError(f"Cannot write results file {path}: {e}") from e
+    logger.info("Wrote %d result(s) to %s", len(results), path)
+
+
+def _parse_target(target_entry: Any) -> Optional[Tuple[str, int]]:
+    """
+    Splits a target entry into (host, port), defaulting to port 443.
+
+    Returns None if the entry is malformed or its port is outside 1-65535.
+    """
+    match = _TARGET_RE.fullmatch(str(target_entry).strip())
+    if not match:
+        return None
+    port = int(match["port"] or 443)  # Default ESXi/vCenter HTTPS port
+    if not 1 <= port <= 65535:
+        return None  # getaddrinfo would silently wrap e.g. 99999 to 34463
+    return match["host"].strip("[]"), port
 
 
 # Main entry point function for this module
@@ -150,6 +514,8 @@ def run(config: Dict[str, Any]):
     esxi_config = config.get("esxi_tester", {})
     targets = esxi_config.get("targets", [])
     timeout = esxi_config.get("check_timeout", 10)  # Default timeout 10s
+    max_connections = esxi_config.get("max_connections", 200)
+    results_file = esxi_config.get("results_file")
 
     if not targets:
         raise ConfigError(
@@ -161,52 +527,80 @@ def run(config: Dict[str, Any]):
         raise EnvironmentError(
             "pyVmomi library is required for the ESXi module but is not installed/found."
         )
+    _load_pyvmomi()
+
+    if not SMARTCONNECT_HAS_TIMEOUTS:
+        logger.warning(
+            "Installed pyVmomi does not support per-connection timeouts "
+            "(needs >= 8.0.0.1); 'check_timeout' will not bound connection attempts."
+        )
 
     logger.warning("Executing SAFE checks against configured ESXi targets.")
     logger.warning("Ensure you have AUTHORIZATION before scanning any targets.")
 
-    results = {}
+    invalid: Dict[Any, Tuple[bool, str]] = {}
+    checks: List[Tuple[Any, str, int]] = []  # (target_entry, host, port)
     for target_entry in targets:
-        host = str(target_entry)  # Basic handling, assumes IP or hostname
-        port = 443  # Default ESXi/vCenter HTTPS port
+        parsed = _parse_target(target_entry)
+        if parsed is None:
+            logger.error("Invalid target format: '%s'. Skipping.", target_entry)
+            invalid[target_entry] = (
+                False,
+                "Invalid format (expected 'host', 'host:port' or '[ipv6]:port').",
+            )
+            continue  # Skip to next target
+        host, port = parsed
+        checks.append((target_entry, host, port))
 
-        # Allow specifying port like "hostname:port" (basic parsing)
-        if ":" in host:
-            try:
-                host, port_str = host.split(":", 1)
-                port = int(port_str)
-            except ValueError:
-                logger.error(f"Invalid target format: '{target_entry}'. Skipping.")
-                results[target_entry] = (
-                    False,
-                    f"Invalid format (expected 'host' or 'host:port').",
-                )
-                continue  # Skip to next target
+    reaped_before = _reaped_connections
+    checked: Dict[Any, Tuple[bool, str]] = {}
+    if checks:
+        concurrency = _effective_concurrency(max_connections, len(checks))
+        logger.info(
+            "Checking %d target(s) with up to %d concurrent connection(s).",
+            len(checks),
+            concurrency,
+        )
+        _install_uvloop()
+        checked = asyncio.run(_check_targets(checks, timeout, concurrency))
 
-        try:
-            success, message = check_esxi_target(host, port, timeout)
-            results[target_entry] = (success, message)
-        except Exception as e:
-            # Catch unexpected errors from the check function itself
-            logger.critical(
-                f"Unexpected error while processing target {target_entry}: {e}",
-                exc_info=True,
-            )
-            results[target_entry] = (False, f"Critical unexpected error: {e}")
-
-    # Log summary of results
-    logger.info("--- ESXi Check Results ---")
-    successful_checks = 0
-    failed_checks = 0
-    for target, (success, message) in results.items():
-        if success:
-            logger.info(f"[+] Target: {target} - SUCCESS: {message}")
-            successful_checks += 1
-        else:
-            logger.warning(f"[-] Target: {target} - FAILED: {message}")
-            failed_checks += 1
+    # Report in the configured target order, wherever each result came from
+    results: Dict[Any, Tuple[bool, str]] = {
+        entry: invalid[entry] if entry in invalid else checked[entry]
+        for entry in targets
+    }
+
+    # Log summary of results: one record per outcome group rather than one per
+    # target, which matters when scanning thousands of hosts.
+    successes = [(t, m) for t, (ok, m) in results.items() if ok]
+    failures = [(t, m) for t, (ok, m) in results.items() if not ok]
+    if successes and logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "--- ESXi Check Results ---\n"
+            + "\n".join(f"[+] Target: {t} - SUCCESS: {m}" for t, m in successes)
+        )
+    if failures and logger.isEnabledFor(logging.WARNING):
+        logger.warning(
+            "--- ESXi Check Failures ---\n"
+            + "\n".join(f"[-] Target: {t} - FAILED: {m}" for t, m in failures)
+        )
     logger.info(
-        f"Summary: {successful_checks} successful connection(s), {failed_checks} failed connection/check(s)."
+        "Summary: %d successful connection(s), %d failed connection/check(s).",
+        len(successes),
+        len(failures),
     )
+    if results_file:
+        _write_results_file(results_file, results)
+    reaped = _reaped_connections - reaped_before
+    if reaped:
+        logger.warning(
+            "%d connection(s) were reaped after exceeding their lifetime.", reaped
+        )
 
     logger.info("--- ESXi Tester Module Finished ---")
+
+
+# Without pyVmomi every check fails the same way; bind the failing stand-in once
+# at import instead of testing PYVMOMI_AVAILABLE on every call.
+if not PYVMOMI_AVAILABLE:
+    check_esxi_target = _pyvmomi_unavailable  # noqa: F811
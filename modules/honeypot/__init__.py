@@ -1,9 +1,17 @@
+import collections
+import copy
+import importlib
+import importlib.util
 import logging
+import threading
 from typing import (
+    Callable,
+    DefaultDict,
     Dict,
     Any,
     List,
     Optional,
+    Tuple,
     Union,
     TYPE_CHECKING,
 )
@@ -11,29 +19,23 @@ from typing import (
 if TYPE_CHECKING:
     import openai
 
-try:
-    import openai
-
-    OPENAI_AVAILABLE = True
-    OpenAIAuthError = openai.error.AuthenticationError
-    OpenAIRateLimitError = openai.error.RateLimitError
-except ImportError:
-    OPENAI_AVAILABLE = False
-
-    if "OpenAIAuthError" not in globals():
-
-        class OpenAIAuthError(Exception):
-            pass
-
-    if "OpenAIRateLimitError" not in globals():
-
-        class OpenAIRateLimitError(Exception):
-            pass
-
+# The OpenAI SDK is imported lazily by _load_openai(): it is heavy and only
+# needed when an API key is configured.
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+if not OPENAI_AVAILABLE:
     print(
         "WARNING: openai library not found. Honeypot module dynamic generation will fail if used with API key."
     )
 
+_openai_module: Any = None  # Populated by _load_openai()
+_openai_lock = threading.Lock()
+# Max keep-alive connections to the OpenAI API
+_OPENAI_POOL_SIZE = 32
+
+# Generated rules per (target_tech, api_key, model), see generate_bait_rules()
+_rule_cache: Dict[Tuple[str, Optional[str], str], List[Dict[str, Any]]] = {}
+_rule_cache_lock = threading.Lock()
+
 try:
     from core.exceptions import HoneypotError, ConfigError, ApiError, EnvironmentError
 except ImportError:
@@ -45,10 +47,61 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _make_openai_session() -> Any:
+    """Creates a requests.Session with a connection pool shared by all API calls."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=_OPENAI_POOL_SIZE, pool_maxsize=_OPENAI_POOL_SIZE
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+def _load_openai() -> Any:
+    """Imports the OpenAI SDK on first use and returns the module."""
+    global _openai_module
+    if _openai_module is None:
+        with _openai_lock:
+            if _openai_module is None:
+                module = importlib.import_module("openai")
+                # openai 0.x opens a new TCP+TLS connection per request unless
+                # given a session; share one so keep-alive connections are reused.
+                # (openai >= 1.0 clients pool connections on their own.)
+                if hasattr(module, "requestssession"):
+                    module.requestssession = _make_openai_session()
+                _openai_module = module
+    return _openai_module
+
+
 def generate_bait_rules(
     target_tech: str, api_key: Optional[str], model: str
 ) -> List[Dict[str, Any]]:
-    logger.info(f"Generating placeholder bait rules for target: {target_tech}")
+    """
+    Returns bait rules for target_tech, generating them on the first request.
+
+    Results are cached per (target_tech, api_key, model) for the life of the
+    process. Each call returns a deep copy, so callers may mutate the rules.
+    """
+    cache_key = (target_tech, api_key, model)
+    with _rule_cache_lock:
+        cached = _rule_cache.get(cache_key)
+    if cached is None:
+        # Generate outside the lock so slow API calls don't serialize callers
+        cached = _generate_bait_rules(target_tech, api_key, model)
+        with _rule_cache_lock:
+            cached = _rule_cache.setdefault(cache_key, cached)
+    else:
+        logger.debug("Using cached bait rules for target: %s", target_tech)
+    return copy.deepcopy(cached)
+
+
+def _generate_bait_rules(
+    target_tech: str, api_key: Optional[str], model: str
+) -> List[Dict[str, Any]]:
+    logger.info("Generating placeholder bait rules for target: %s", target_tech)
 
     if api_key and not OPENAI_AVAILABLE:
         raise EnvironmentError(
@@ -56,8 +109,10 @@ def generate_bait_rules(
         )
 
     if api_key and OPENAI_AVAILABLE:
+        _load_openai()
         logger.warning(
-            f"OpenAI API key provided, but actual generation via model '{model}' is NOT YET IMPLEMENTED."
+            "OpenAI API key provided, but actual generation via model '%s' is NOT YET IMPLEMENTED.",
+            model,
         )
         logger.warning("Using hardcoded placeholder rules instead.")
     else:
@@ -80,23 +135,65 @@ def generate_bait_rules(
     return placeholder_rules
 
 
+# One log record per deployed rule
+_DEPLOY_RULE_LOG_TEMPLATE = (
+    "Deploying Rule ID: %s\n"
+    "  Target Tech: %s\n"
+    "  Rule Type: %s\n"
+    "  Content/Action: %s"
+)
+
+
+def _log_rule_deployments(rules: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Logs one record per (rule_id, rule) pair."""
+    # Skip per-rule formatting entirely when INFO is disabled
+    if logger.isEnabledFor(logging.INFO):
+        for rule_id, rule in rules:
+            logger.info(
+                _DEPLOY_RULE_LOG_TEMPLATE,
+                rule_id,
+                rule.get("target_tech", "generic"),
+                rule.get("type", "unknown"),
+                rule.get("decoy_content") or rule.get("action"),
+            )
+
+
+def _deploy_banner_grab_batch(rules: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Deploys all banner_grab rules together (simulated)."""
+    # A real deployment applies these as one listener/ruleset update
+    # rather than one per rule.
+    logger.debug("Deploying %d banner_grab rule(s) as one batch.", len(rules))
+    _log_rule_deployments(rules)
+
+
+def _deploy_generic_batch(rules: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Deploys rules of a type without a dedicated batch deployer (simulated)."""
+    _log_rule_deployments(rules)
+
+
+# Batch deployer per rule "type"; unknown types use _deploy_generic_batch
+_BATCH_DEPLOYERS: Dict[str, Callable[[List[Tuple[str, Dict[str, Any]]]], None]] = {
+    "banner_grab": _deploy_banner_grab_batch,
+}
+
+
 def deploy_honeypot(rules: List[Dict[str, Any]]):
-    logger.info(f"--- Simulating Honeypot Deployment ({len(rules)} rule(s)) ---")
+    logger.info("--- Simulating Honeypot Deployment (%d rule(s)) ---", len(rules))
     if not rules:
         logger.warning("No rules provided for deployment.")
         return
 
+    # Group rules by type so each type is deployed in a single batch
+    rules_by_type: DefaultDict[
+        str, List[Tuple[str, Dict[str, Any]]]
+    ] = collections.defaultdict(list)
     for i, rule in enumerate(rules):
         rule_id = rule.get("rule_id", f"rule_{i+1}")
-        rule_type = rule.get("type", "unknown")
-        target = rule.get("target_tech", "generic")
-        logger.info(f"Deploying Rule ID: {rule_id}")
-        logger.info(f"  Target Tech: {target}")
-        logger.info(f"  Rule Type: {rule_type}")
-        logger.info(
-            f"  Content/Action: {rule.get('decoy_content') or rule.get('action')}"
-        )
-        logger.debug(f"Placeholder deployment for rule {rule_id} complete.")
+        rules_by_type[rule.get("type", "unknown")].append((rule_id, rule))
+
+    for rule_type, typed_rules in rules_by_type.items():
+        deployer = _BATCH_DEPLOYERS.get(rule_type, _deploy_generic_batch)
+        deployer(typed_rules)
 
     logger.info("--- Honeypot Deployment Simulation Finished ---")
 
@@ -107,7 +204,7 @@ def run(config: Dict[str, Any]):
     openai_config = config.get("openai", {})
 
     target_technology = honeypot_config.get("target_tech_simulation", "Generic Service")
-    logger.info(f"Configured to simulate honeypot for: {target_technology}")
+    logger.info("Configured to simulate honeypot for: %s", target_technology)
 
     api_key = openai_config.get("api_key")
     model = openai_config.get("model", "gpt-3.5-turbo")
@@ -117,13 +214,13 @@ def run(config: Dict[str, Any]):
             target_tech=target_technology, api_key=api_key, model=model
         )
     except (ApiError, EnvironmentError) as e:
-        logger.error(f"Failed to generate honeypot rules: {e}")
+        logger.error("Failed to generate honeypot rules: %s", e)
         raise HoneypotError(f"Rule generation failed: {e}") from e
 
     try:
         deploy_honeypot(generated_rules)
     except Exception as e:
-        logger.error(f"Error during simulated honeypot deployment: {e}", exc_info=True)
+        logger.error("Error during simulated honeypot deployment: %s", e, exc_info=True)
         raise HoneypotError(f"Simulated deployment failed: {e}") from e
 
     logger.info("--- Honeypot Module Finished ---")
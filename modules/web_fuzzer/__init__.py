@@ -1,8 +1,21 @@
+import array
+import asyncio
+import dataclasses
+import functools
+import json
 import logging
 import subprocess
 import shlex
+import shutil
 import os
-from typing import Dict, Any, Optional, Union  # Added Union
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, Union  # Added Union
+
+try:
+    import orjson  # Optional; parses Nuclei's JSONL output faster
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads  # type: ignore[assignment]
 
 # Assuming core utilities are accessible via the Python path
 # Adjust import path if needed based on how you run/install
@@ -20,19 +33,62 @@ except ImportError:
 
 logger = logging.getLogger(__name__)  # Gets logger named "modules.web_fuzzer"
 
+# Popen arguments that let CPython start Nuclei with os.posix_spawn instead of
+# fork + exec, which avoids copying this process's page tables on every launch.
+# posix_spawn also needs an absolute executable path, no preexec_fn/cwd and no
+# new session or process group. Our descriptors are non-inheritable (PEP 446),
+# so skipping close_fds does not leak them to the child.
+_SPAWN_KWARGS: Dict[str, Any] = {"close_fds": False}
 
-def check_nuclei_installed() -> bool:
-    """Checks if the 'nuclei' command is accessible in the PATH."""
+# Flags passed to every Nuclei run, ahead of the per-call arguments:
+# -duc skips Nuclei's online update check, which otherwise runs on every start.
+# -jsonl makes stdout one JSON object per finding, parsed by _collect_findings.
+_BASE_FLAGS = ("-duc", "-jsonl")
+
+# Maximum bytes of Nuclei output read (and logged as one record) at a time
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Nuclei findings as parallel sequences ("structure of arrays"), one entry per
+# finding in each, so callers can filter on one field without touching
+# the others.
+# Severities are stored as uint8 codes in an array('B'), ordered so that
+# comparisons work (e.g. code >= SEVERITY_CODES["high"]); SEVERITY_NAMES maps
+# a code back to Nuclei's name. Unrecognized severities become "unknown" (0).
+Findings = Dict[str, Any]
+FINDING_FIELDS = ("template_id", "host", "severity", "info")
+SEVERITY_NAMES = ("unknown", "info", "low", "medium", "high", "critical")
+SEVERITY_CODES = {name: code for code, name in enumerate(SEVERITY_NAMES)}
+
+
+def _new_findings() -> Findings:
+    """Returns an empty findings container (see FINDING_FIELDS)."""
+    return {
+        "template_id": [],
+        "host": [],
+        "severity": array.array("B"),
+        "info": [],
+    }
+
+
+@functools.lru_cache(maxsize=4)
+def _nuclei_probe(path: str, mtime_ns: int) -> bool:
+    """
+    Runs 'nuclei -version' once per executable path and modification time.
+
+    Timeouts and unexpected errors are raised rather than returned, so that a
+    transient failure is not cached.
+    """
     try:
         # Use subprocess.run to check, suppress output
         subprocess.run(
-            ["nuclei", "-version"],
+            [path, "-version"],
             capture_output=True,
             text=True,
             check=True,
             timeout=10,
+            **_SPAWN_KWARGS,
         )
-        logger.debug("Nuclei installation confirmed.")
+        logger.debug("Nuclei installation confirmed: %s", path)
         return True
     except FileNotFoundError:
         logger.error(
@@ -41,93 +97,223 @@ def check_nuclei_installed() -> bool:
         return False
     except subprocess.CalledProcessError as e:
         logger.warning(
-            f"Nuclei command found, but '-version' exited with error: {e.stderr}"
+            "Nuclei command found, but '-version' exited with error: %s", e.stderr
         )
         # Could still be usable, but maybe misconfigured? Treat as installed for now.
         return True
+
+
+def check_nuclei_installed() -> bool:
+    """Checks if the 'nuclei' command is accessible in the PATH."""
+    path = shutil.which("nuclei")
+    if not path:
+        logger.error(
+            "Nuclei command not found. Please install Nuclei and ensure it's in your system PATH."
+        )
+        return False
+    try:
+        # Re-probe only when the executable is replaced or updated
+        return _nuclei_probe(path, os.stat(path).st_mtime_ns)
     except subprocess.TimeoutExpired:
         logger.error("Checking Nuclei version timed out.")
         return False
     except Exception as e:
-        logger.error(f"Unexpected error while checking for Nuclei: {e}")
+        logger.error("Unexpected error while checking for Nuclei: %s", e)
         return False
 
 
-# Optional type hints are fine
-def run_nuclei(
-    target_url: str,
+check_nuclei_installed.cache_clear = _nuclei_probe.cache_clear  # type: ignore[attr-defined]
+
+
+class _OutputLines:
+    """A batch of raw Nuclei output lines, decoded only when a log record is formatted."""
+
+    __slots__ = ("label", "lines")
+
+    def __init__(self, label: str, lines: List[bytes]):
+        self.label = label
+        self.lines = lines
+
+    def __str__(self) -> str:
+        prefix = f"  [{self.label}] ".encode()
+        # One decode for the whole batch instead of one per line
+        return b"\n".join(prefix + line.rstrip() for line in self.lines).decode(
+            "utf-8", errors="replace"
+        )
+
+
+def _log_output_lines(label: str, lines: List[bytes]) -> int:
+    """Logs a batch of Nuclei output lines as one record. Returns the line count."""
+    if lines and logger.isEnabledFor(logging.INFO):
+        logger.info("%s", _OutputLines(label, lines))
+    return len(lines)
+
+
+async def _read_line_batches(
+    stream: asyncio.StreamReader,
+) -> AsyncIterator[List[bytes]]:
+    """
+    Yields the lines of a Nuclei output stream in batches while it runs.
+
+    Each read returns whatever output is available (up to _READ_CHUNK_SIZE)
+    and yields its complete lines together, so noisy scans are handled one
+    chunk at a time instead of one line at a time.
+    """
+    pending = b""
+    while True:
+        chunk = await stream.read(_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()  # Incomplete last line, completed by the next read
+        if lines:
+            yield lines
+    if pending:
+        yield [pending]
+
+
+async def _drain(stream: asyncio.StreamReader, label: str) -> int:
+    """Logs a Nuclei output stream, one record per chunk. Returns the number of lines."""
+    count = 0
+    async for lines in _read_line_batches(stream):
+        count += _log_output_lines(label, lines)
+    return count
+
+
+async def _collect_findings(stream: asyncio.StreamReader, findings: Findings) -> int:
+    """
+    Parses Nuclei's JSONL stdout into `findings` as it arrives.
+
+    Lines that are not JSON objects (e.g. from extra flags that change the
+    output) are logged like plain Nuclei output. Returns the number of lines.
+    """
+    count = 0
+    async for lines in _read_line_batches(stream):
+        unparsed = []
+        for line in lines:
+            if not line.strip():
+                continue
+            count += 1
+            try:
+                record = _json_loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                unparsed.append(line)
+                continue
+            info = record.get("info")
+            if not isinstance(info, dict):
+                info = {}
+            findings["template_id"].append(record.get("template-id"))
+            findings["host"].append(record.get("host"))
+            findings["severity"].append(
+                SEVERITY_CODES.get(str(info.get("severity", "")).lower(), 0)
+            )
+            findings["info"].append(info)
+        _log_output_lines("NUCLEI_OUT", unparsed)
+    return count
+
+
+async def _stop_nuclei(
+    process: asyncio.subprocess.Process, tasks: List["asyncio.Future[Any]"]
+) -> None:
+    """Kills Nuclei if it is still running and waits for its I/O tasks to finish."""
+    for task in tasks:
+        task.cancel()  # No-op for tasks that already finished
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass  # Exited since returncode was checked
+        await process.wait()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_extra_flags(extra_flags_str: str) -> Tuple[str, ...]:
+    """Splits the configured extra Nuclei flags (cached; the string rarely changes)."""
+    return tuple(shlex.split(extra_flags_str))
+
+
+async def _feed_targets(stdin: asyncio.StreamWriter, target_urls: List[str]) -> None:
+    """Writes the target URLs to Nuclei's stdin, one per line, then closes it."""
+    try:
+        stdin.write(("\n".join(target_urls) + "\n").encode())
+        await stdin.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # Nuclei exited early; its exit status reports why
+    finally:
+        stdin.close()
+
+
+def _build_nuclei_command(
+    target_count: int,
     templates_path: Optional[str],
     extra_flags_str: str,
-    process_timeout: int,
-) -> bool:
+    cache_dir: Optional[str] = None,
+    concurrency: Optional[int] = None,
+) -> Tuple[List[str], Optional[Dict[str, str]]]:
     """
-    Runs the Nuclei scanner against a target URL using subprocess.
-
-    Args:
-        target_url: The URL to scan.
-        templates_path: Optional path/glob for Nuclei templates (-t flag).
-        extra_flags_str: String of additional Nuclei command-line flags.
-        process_timeout: Timeout in seconds for the Nuclei process.
+    Builds the Nuclei command line and environment for run_nuclei_batch.
 
     Returns:
-        True if Nuclei ran successfully (exit code 0). Note: Does not indicate findings.
-
-    Raises:
-        WebFuzzerError: If Nuclei fails to execute (e.g., timeout, non-zero exit).
-        EnvironmentError: If Nuclei command is not found initially.
+        A tuple (command, env); env is None to inherit this process's environment.
     """
-    logger.info(f"Preparing to run Nuclei against: {target_url}")
-    command = ["nuclei", "-u", target_url]
+    # An absolute executable path is one of the conditions for posix_spawn.
+    # Without -u/-l, Nuclei reads its targets from stdin (see _feed_targets).
+    command = [shutil.which("nuclei") or "nuclei", *_BASE_FLAGS]
+
+    env = None  # Inherit our environment unless a cache directory is configured
+    if cache_dir:
+        env = dict(os.environ, NUCLEI_CONFIG_DIR=os.path.expanduser(cache_dir))
+        logger.info("Using Nuclei config/cache directory: %s", env["NUCLEI_CONFIG_DIR"])
 
     if templates_path:
         command.extend(["-t", templates_path])
-        logger.info(f"Using Nuclei templates from: {templates_path}")
+        logger.info("Using Nuclei templates from: %s", templates_path)
+
+    if concurrency:
+        # No point asking for more parallel hosts than there are targets
+        bulk_size = max(1, min(int(concurrency), target_count))
+        command.extend(["-bs", str(bulk_size)])
+        logger.info("Scanning up to %d target(s) in parallel.", bulk_size)
 
     if extra_flags_str:
         try:
-            extra_args = shlex.split(extra_flags_str)
+            extra_args = _parse_extra_flags(extra_flags_str)
             command.extend(extra_args)
-            logger.info(f"Adding extra Nuclei flags: {extra_args}")
+            logger.info("Adding extra Nuclei flags: %s", list(extra_args))
         except ValueError as e:
             logger.error(
-                f"Error parsing extra flags '{extra_flags_str}': {e}. Flags ignored."
+                "Error parsing extra flags '%s': %s. Flags ignored.", extra_flags_str, e
             )
 
-    safe_command_str = " ".join(shlex.quote(c) for c in command)
-    logger.debug(f"Executing Nuclei command: {safe_command_str}")
+    if logger.isEnabledFor(logging.DEBUG):
+        safe_command_str = " ".join(shlex.quote(c) for c in command)
+        logger.debug("Executing Nuclei command: %s", safe_command_str)
 
-    try:
-        process = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=process_timeout,
-        )
+    return command, env
 
-        if process.stdout:
-            logger.info("Nuclei stdout:")
-            for line in process.stdout.strip().splitlines():
-                logger.info(f"  [NUCLEI_OUT] {line}")
-        else:
-            logger.info("Nuclei stdout: (empty)")
-
-        if process.stderr:
-            logger.info("Nuclei stderr:")
-            for line in process.stderr.strip().splitlines():
-                logger.info(f"  [NUCLEI_ERR] {line}")
-        else:
-            logger.info("Nuclei stderr: (empty)")
-
-        if process.returncode != 0:
-            logger.error(f"Nuclei exited with non-zero status: {process.returncode}")
-            raise WebFuzzerError(
-                f"Nuclei process failed with exit code {process.returncode}."
-            )
-        else:
-            logger.info("Nuclei scan process completed successfully (exit code 0).")
-            return True
 
+async def _spawn_nuclei(
+    command: List[str], env: Optional[Dict[str, str]]
+) -> asyncio.subprocess.Process:
+    """
+    Starts Nuclei with all three standard streams piped.
+
+    Raises:
+        EnvironmentError: If the Nuclei executable is not found.
+        WebFuzzerError: If Nuclei cannot be started for any other reason.
+    """
+    try:
+        return await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            **_SPAWN_KWARGS,
+        )
     except FileNotFoundError:
         logger.critical(
             "Nuclei command failed with FileNotFoundError during execution attempt."
@@ -135,19 +321,200 @@ def run_nuclei(
         raise EnvironmentError(
             "Nuclei executable not found during execution. Please ensure it is installed and in the system PATH."
         ) from None
-    except subprocess.TimeoutExpired:
-        logger.error(f"Nuclei scan timed out after {process_timeout} seconds.")
-        raise WebFuzzerError(
-            f"Nuclei scan process timed out ({process_timeout}s)."
-        ) from None
     except Exception as e:
         logger.critical(
-            f"An unexpected error occurred while running Nuclei command: {e}",
+            "An unexpected error occurred while running Nuclei command: %s",
+            e,
             exc_info=True,
         )
         raise WebFuzzerError(f"Nuclei execution failed unexpectedly: {e}") from e
 
 
+async def run_nuclei_batch(
+    target_urls: List[str],
+    templates_path: Optional[str],
+    extra_flags_str: str,
+    process_timeout: int,
+    cache_dir: Optional[str] = None,
+    concurrency: Optional[int] = None,
+) -> Findings:
+    """
+    Runs one Nuclei process against all target URLs as an asyncio subprocess.
+
+    The targets are fed to Nuclei's stdin, so Nuclei loads its templates once
+    for the whole batch rather than once per URL, without a temporary list
+    file. Findings are parsed from Nuclei's JSONL output while it runs.
+
+    Args:
+        target_urls: The URLs to scan.
+        templates_path: Optional path/glob for Nuclei templates (-t flag).
+        extra_flags_str: String of additional Nuclei command-line flags.
+        process_timeout: Timeout in seconds for the Nuclei process.
+        cache_dir: Optional Nuclei config/cache directory (NUCLEI_CONFIG_DIR), e.g.
+            a directory shared between CI runs.
+        concurrency: Optional number of targets Nuclei scans in parallel
+            (-bulk-size); Nuclei's own default is used if None.
+
+    Returns:
+        The findings as parallel sequences keyed by FINDING_FIELDS (template_id,
+        host, severity, info); entry i of each belongs to the same finding.
+        "severity" is an array('B') of SEVERITY_CODES values.
+
+    Raises:
+        WebFuzzerError: If Nuclei fails to execute (e.g., timeout, non-zero exit).
+        EnvironmentError: If Nuclei command is not found initially.
+    """
+    scope = target_urls[0] if len(target_urls) == 1 else f"{len(target_urls)} targets"
+    logger.info("Preparing to run Nuclei against: %s", scope)
+    command, env = _build_nuclei_command(
+        len(target_urls), templates_path, extra_flags_str, cache_dir, concurrency
+    )
+
+    process = await _spawn_nuclei(command, env)
+    # _spawn_nuclei pipes all three streams; narrows the Optional types for mypy
+    assert process.stdin and process.stdout and process.stderr
+
+    findings = _new_findings()
+    tasks = [
+        asyncio.ensure_future(_feed_targets(process.stdin, target_urls)),
+        asyncio.ensure_future(_collect_findings(process.stdout, findings)),
+        asyncio.ensure_future(_drain(process.stderr, "NUCLEI_ERR")),
+        asyncio.ensure_future(process.wait()),
+    ]
+    try:
+        _, stdout_lines, stderr_lines, returncode = await asyncio.wait_for(
+            asyncio.gather(*tasks), timeout=process_timeout
+        )
+    except asyncio.TimeoutError:
+        logger.error(
+            "Nuclei scan of %s timed out after %s seconds.", scope, process_timeout
+        )
+        raise WebFuzzerError(
+            f"Nuclei scan process timed out ({process_timeout}s)."
+        ) from None
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(
+            "Error while handling Nuclei output for %s: %s", scope, e, exc_info=True
+        )
+        raise WebFuzzerError(f"Nuclei output handling failed: {e}") from e
+    finally:
+        # Never leave Nuclei or its pipe readers behind, whatever went wrong
+        await _stop_nuclei(process, tasks)
+
+    if not stdout_lines:
+        logger.info("Nuclei stdout: (empty)")
+    elif not findings["template_id"]:
+        logger.info("Nuclei stdout contained no JSON findings.")
+    if not stderr_lines:
+        logger.info("Nuclei stderr: (empty)")
+
+    if returncode != 0:
+        logger.error("Nuclei exited with non-zero status for %s: %s", scope, returncode)
+        raise WebFuzzerError(f"Nuclei process failed with exit code {returncode}.")
+    logger.info("Nuclei scan of %s completed successfully (exit code 0).", scope)
+    return findings
+
+
+# Optional type hints are fine
+async def run_nuclei(
+    target_url: str,
+    templates_path: Optional[str],
+    extra_flags_str: str,
+    process_timeout: int,
+    cache_dir: Optional[str] = None,
+) -> Findings:
+    """Runs the Nuclei scanner against a single target URL. See run_nuclei_batch."""
+    return await run_nuclei_batch(
+        [target_url], templates_path, extra_flags_str, process_timeout, cache_dir
+    )
+
+
+def _log_findings(findings: Findings) -> None:
+    """Logs a summary of Nuclei findings as a single record."""
+    if not logger.isEnabledFor(logging.INFO):
+        return  # Skip building the summary when it would be discarded
+    total = len(findings["template_id"])
+    if not total:
+        logger.info("Nuclei reported no findings.")
+        return
+    logger.info(
+        "Nuclei reported %d finding(s):\n%s",
+        total,
+        "\n".join(
+            f"  [{SEVERITY_NAMES[severity]}] {template_id} {host}"
+            for template_id, host, severity in zip(
+                findings["template_id"], findings["host"], findings["severity"]
+            )
+        ),
+    )
+
+
+def _positive_int(value: Any, setting: str) -> int:
+    """Returns value if it is a positive integer, else raises ConfigError naming the setting."""
+    # bool is an int subclass, but 'true' is never a meaningful count
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ConfigError(
+            f"Setting '{setting}' must be a positive integer, got {value!r}."
+        )
+    return value
+
+
+@dataclasses.dataclass(frozen=True)
+class WebFuzzerConfig:
+    """The web_fuzzer settings used by run(), read and validated once."""
+
+    target_urls: Tuple[str, ...]
+    templates_path: Optional[str] = None
+    extra_flags: str = ""
+    process_timeout: int = 600
+    cache_dir: Optional[str] = None
+    concurrency: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "WebFuzzerConfig":
+        """
+        Builds the settings from the full LahMa config dict.
+
+        Raises:
+            ConfigError: If no target URL is configured, or a setting has the wrong type.
+        """
+        fuzzer_config = config.get("web_fuzzer") or {}
+        nuclei_config = fuzzer_config.get("nuclei") or {}
+
+        # 'target_url' scans one URL; 'target_urls' adds more to the same batch
+        raw_target_urls = fuzzer_config.get("target_urls") or []
+        if not isinstance(raw_target_urls, (list, tuple)):
+            raise ConfigError(
+                f"Setting 'web_fuzzer.target_urls' must be a list of URLs, got {raw_target_urls!r}."
+            )
+        target_urls = list(raw_target_urls)
+        target_url = fuzzer_config.get("target_url")
+        if target_url and target_url not in target_urls:
+            target_urls.insert(0, target_url)
+        if not target_urls:
+            raise ConfigError(
+                "Required setting 'web_fuzzer.target_url' (or 'web_fuzzer.target_urls') is missing in configuration."
+            )
+
+        concurrency = nuclei_config.get("concurrency")
+        if concurrency is not None:
+            concurrency = _positive_int(concurrency, "web_fuzzer.nuclei.concurrency")
+
+        return cls(
+            target_urls=tuple(target_urls),
+            templates_path=nuclei_config.get("templates_path"),
+            extra_flags=nuclei_config.get("extra_flags") or "",
+            process_timeout=_positive_int(
+                nuclei_config.get("process_timeout", 600),
+                "web_fuzzer.nuclei.process_timeout",
+            ),
+            cache_dir=nuclei_config.get("cache_dir"),
+            concurrency=concurrency,
+        )
+
+
 # Placeholder for other tools like ParamSpider
 def run_paramspider(target_url: str, config: Dict[str, Any]):
     logger.warning("ParamSpider functionality is not yet implemented.")
@@ -155,21 +522,17 @@ def run_paramspider(target_url: str, config: Dict[str, Any]):
 
 
 # Main entry point function for this module, called by lahma.py
-def run(config: Dict[str, Any]):
+def run(config: Dict[str, Any]) -> Findings:
     """
     Entry point for the Web Fuzzer module. Orchestrates scans.
+
+    Returns:
+        The Nuclei findings (see run_nuclei_batch).
     """
     logger.info("--- Starting Web Fuzzer Module ---")
-    fuzzer_config = config.get("web_fuzzer", {})
-    nuclei_config = fuzzer_config.get("nuclei", {})
+    cfg = WebFuzzerConfig.from_dict(config)
 
-    target_url = fuzzer_config.get("target_url")
-    if not target_url:
-        raise ConfigError(
-            "Required setting 'web_fuzzer.target_url' is missing in configuration."
-        )
-
-    logger.info(f"Target URL: {target_url}")
+    logger.info("Target URL(s): %s", ", ".join(cfg.target_urls))
 
     # 1. Check for external dependencies (Nuclei)
     if not check_nuclei_installed():
@@ -180,21 +543,22 @@ def run(config: Dict[str, Any]):
     # 2. Run ParamSpider (Placeholder)
     # ...
 
-    # 3. Run Nuclei Scan
-    logger.info("Proceeding with Nuclei scan...")
-    nuclei_success = (
-        run_nuclei(  # Directly call run_nuclei; it will raise errors on failure
-            target_url=target_url,
-            templates_path=nuclei_config.get("templates_path"),
-            extra_flags_str=nuclei_config.get("extra_flags", ""),
-            process_timeout=nuclei_config.get("process_timeout", 600),
+    # 3. Run Nuclei Scan (one process for all targets; raises errors on failure)
+    logger.info("Proceeding with Nuclei scan of %d target(s)...", len(cfg.target_urls))
+    findings = asyncio.run(
+        run_nuclei_batch(
+            target_urls=list(cfg.target_urls),
+            templates_path=cfg.templates_path,
+            extra_flags_str=cfg.extra_flags,
+            process_timeout=cfg.process_timeout,
+            cache_dir=cfg.cache_dir,
+            concurrency=cfg.concurrency,
         )
     )
 
-    # This code only runs if run_nuclei returns True (doesn't raise an error)
-    if nuclei_success:
-        logger.info("Nuclei scan execution completed.")
-        # TODO: Add parsing of Nuclei results here (e.g., if -json flag used)
+    logger.info("Nuclei scan execution completed.")
+    _log_findings(findings)
 
     # 4. Wrap up
     logger.info("--- Web Fuzzer Module Finished ---")
+    return findings
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+import yaml
+
+from core.config import load_config
+
+# Same libyaml-backed dumper as tests/test_config.py
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper  # type: ignore[assignment]
+
+
+def pytest_configure(config):
+    """Fails fast in CI if PyYAML lacks libyaml, so the C loader/dumper is what gets tested."""
+    if os.environ.get("CI") and not getattr(yaml, "__with_libyaml__", False):
+        raise pytest.UsageError(
+            "PyYAML was installed without libyaml bindings. "
+            "Reinstall it with libyaml support (e.g. from the binary wheel)."
+        )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def clear_config_cache_at_exit():
+    """Drops the in-process config cache once the test session ends."""
+    yield
+    load_config.cache_clear()
+
+
+# Contents of the dummy config files created by mock_config_files (test_config.py)
+EXAMPLE_CONFIG = {
+    "logging": {"level": "INFO"},
+    "web_fuzzer": {"target_url": "http://example.com"},
+    "openai": {"model": "gpt-test"},
+}
+ACTUAL_CONFIG = {
+    "logging": {"level": "DEBUG", "file": "test.log"},
+    "web_fuzzer": {"target_url": "http://actual-test.com"},
+    "esxi_tester": {"targets": ["10.0.0.1"]},
+}
+SPECIFIC_CONFIG = {
+    "logging": {"level": "WARNING"},
+    "openai": {"api_key": "specific_key"},
+}
+
+
+@pytest.fixture(scope="session")
+def yaml_payloads():
+    """Serializes the dummy configs to YAML bytes once per test session."""
+    return {
+        "example": yaml.dump(EXAMPLE_CONFIG, Dumper=SafeDumper).encode(),
+        "actual": yaml.dump(ACTUAL_CONFIG, Dumper=SafeDumper).encode(),
+        "specific": yaml.dump(SPECIFIC_CONFIG, Dumper=SafeDumper).encode(),
+    }
@@ -0,0 +1,44 @@
+import pytest
+from unittest.mock import patch
+
+# Import the functions to test from the CLI script
+import lahma
+from lahma import build_parser, main
+
+# --- Test Cases ---
+
+
+def test_parser_run_module_case_insensitive():
+    """Test the run subcommand lower-cases the module name and upper-cases the log level."""
+    args = build_parser().parse_args(["--log-level", "debug", "run", "ESXI"])
+    assert args.cmd == "run"
+    assert args.mode == "esxi"
+    assert args.log_level == "DEBUG"
+    assert args.config is None  # Let load_config find the default
+
+
+def test_parser_rejects_unknown_module(capsys):
+    """Test an unknown module name is rejected with a usage error."""
+    with pytest.raises(SystemExit) as exc_info:
+        build_parser().parse_args(["run", "nonexistent"])
+    assert exc_info.value.code == 2
+    assert "invalid choice" in capsys.readouterr().err
+
+
+def test_main_without_command_prints_help(capsys):
+    """Test running with no subcommand shows usage without loading config."""
+    with patch.object(lahma, "cli") as mock_cli:
+        main([])
+    mock_cli.assert_not_called()
+    assert "usage: lahma" in capsys.readouterr().out
+
+
+def test_main_runs_selected_module():
+    """Test main loads config with the CLI overrides and runs the chosen module."""
+    cfg = {"web_fuzzer": {}}
+    with patch.object(lahma, "cli", return_value=cfg) as mock_cli, patch.object(
+        lahma, "run_module"
+    ) as mock_run_module:
+        main(["-c", "custom.yaml", "--log-file", "NONE", "run", "fuzz"])
+    mock_cli.assert_called_once_with("custom.yaml", None, "NONE")
+    mock_run_module.assert_called_once_with(cfg, "fuzz")
@@ -3,16 +3,33 @@ import os
 import yaml
 from unittest.mock import patch, mock_open
 
+# Use the libyaml-backed dumper like core.config uses the libyaml loader
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper  # type: ignore[assignment]
+
 # Import the functions/classes to test from core.config
 # Adjust path if necessary, but usually Python path handles this
+import core.config
 from core.config import load_config, find_config_file, DEFAULT_CONFIG_PATH, CONFIG_DIR
 from core.exceptions import ConfigError
 
 # --- Fixtures (Helper functions/data for tests) ---
 
 
+@pytest.fixture(autouse=True)
+def isolated_config_cache(tmp_path, monkeypatch):
+    """Points the on-disk config cache at a per-test temporary file."""
+    cache_path = tmp_path / "cache" / "config.pkl"
+    monkeypatch.setattr(core.config, "CONFIG_CACHE_PATH", str(cache_path))
+    load_config.cache_clear()
+    yield cache_path
+    load_config.cache_clear()
+
+
 @pytest.fixture(scope="function")  # Re-run for each test function using it
-def mock_config_files(tmp_path):
+def mock_config_files(tmp_path, yaml_payloads):
     """Creates temporary dummy config files for testing."""
     # tmp_path is a unique temporary directory provided by pytest
     config_dir = tmp_path / CONFIG_DIR  # Use CONFIG_DIR constant from core.config
@@ -20,32 +37,15 @@ def mock_config_files(tmp_path):
 
     # Create a dummy example config
     example_path = config_dir / "config.example.yaml"
-    example_content = {
-        "logging": {"level": "INFO"},
-        "web_fuzzer": {"target_url": "http://example.com"},
-        "openai": {"model": "gpt-test"},
-    }
-    with open(example_path, "w") as f:
-        yaml.dump(example_content, f)
+    example_path.write_bytes(yaml_payloads["example"])
 
     # Create a dummy actual config
     actual_path = config_dir / "config.yaml"
-    actual_content = {
-        "logging": {"level": "DEBUG", "file": "test.log"},
-        "web_fuzzer": {"target_url": "http://actual-test.com"},
-        "esxi_tester": {"targets": ["10.0.0.1"]},
-    }
-    with open(actual_path, "w") as f:
-        yaml.dump(actual_content, f)
+    actual_path.write_bytes(yaml_payloads["actual"])
 
     # Create a dummy specific config
     specific_path = tmp_path / "specific_config.yaml"
-    specific_content = {
-        "logging": {"level": "WARNING"},
-        "openai": {"api_key": "specific_key"},
-    }
-    with open(specific_path, "w") as f:
-        yaml.dump(specific_content, f)
+    specific_path.write_bytes(yaml_payloads["specific"])
 
     # Create an invalid yaml file
     invalid_yaml_path = config_dir / "invalid.yaml"
@@ -69,8 +69,6 @@ def mock_config_files(tmp_path):
 
 def test_find_config_specific_path_exists(mock_config_files):
     """Test finding config when a specific valid path is given."""
-    # Don't need to change directory if we pass absolute path from fixture
-    # os.chdir(mock_config_files["tmp_path"])
     found_path = find_config_file(str(mock_config_files["specific"]))
     assert found_path == str(
         mock_config_files["specific"]
@@ -85,39 +83,47 @@ def test_find_config_specific_path_missing():
 
 def test_find_config_default_path_exists(mock_config_files):
     """Test finding config uses default path (config/config.yaml) if it exists."""
-    # Change working dir to simulate running from project root relative to temp dir
-    os.chdir(mock_config_files["tmp_path"])
-    expected_relative_default = os.path.join(
-        CONFIG_DIR, "config.yaml"
-    )  # Expect relative path
-    found_path = find_config_file(None)  # No arg provided
-    assert found_path == expected_relative_default
+    # Look up config/ relative to the temp dir, as if it were the project root
+    base_dir = str(mock_config_files["tmp_path"])
+    expected_default = os.path.join(base_dir, CONFIG_DIR, "config.yaml")
+    found_path = find_config_file(None, base_dir=base_dir)  # No arg provided
+    assert found_path == expected_default
 
 
 def test_find_config_fallback_to_example(mock_config_files):
     """Test finding config falls back to example if default is missing."""
-    os.chdir(mock_config_files["tmp_path"])
+    base_dir = str(mock_config_files["tmp_path"])
     os.remove(mock_config_files["actual"])  # Remove the default config.yaml
-    expected_relative_example = os.path.join(
-        CONFIG_DIR, "config.example.yaml"
-    )  # Expect relative path
-    found_path = find_config_file(None)
-    assert found_path == expected_relative_example
+    expected_example = os.path.join(base_dir, CONFIG_DIR, "config.example.yaml")
+    found_path = find_config_file(None, base_dir=base_dir)
+    assert found_path == expected_example
 
 
 def test_find_config_no_files_found(mock_config_files):
     """Test finding config returns None if no default or example exists."""
-    os.chdir(mock_config_files["tmp_path"])
+    base_dir = str(mock_config_files["tmp_path"])
     os.remove(mock_config_files["actual"])
     os.remove(mock_config_files["example"])
-    found_path = find_config_file(None)
+    found_path = find_config_file(None, base_dir=base_dir)
     assert found_path is None
 
 
+def test_find_config_lists_config_dir_once(mock_config_files):
+    """Test default/example discovery reads the config directory in a single pass."""
+    base_dir = str(mock_config_files["tmp_path"])
+    with patch("core.config.os.scandir", wraps=os.scandir) as mock_scandir, patch(
+        "core.config.os.path.exists"
+    ) as mock_exists:
+        found_path = find_config_file(None, base_dir=base_dir)
+    assert found_path == os.path.join(base_dir, CONFIG_DIR, "config.yaml")
+    mock_scandir.assert_called_once_with(os.path.join(base_dir, CONFIG_DIR))
+    mock_exists.assert_not_called()
+
+
 def test_load_config_uses_default(mock_config_files):
     """Test loading config uses config.yaml when available."""
-    os.chdir(mock_config_files["tmp_path"])
-    config = load_config(None)  # Load default
+    base_dir = str(mock_config_files["tmp_path"])
+    config = load_config(None, base_dir=base_dir)  # Load default
     # Check values from default config file
     assert config["logging"]["level"] == "DEBUG"
     assert config["web_fuzzer"]["target_url"] == "http://actual-test.com"
@@ -130,8 +136,6 @@ def test_load_config_uses_default(mock_config_files):
 
 def test_load_config_uses_specific_path(mock_config_files):
     """Test loading config uses the file specified in the argument."""
-    # No need to change dir when providing absolute path
-    # os.chdir(mock_config_files["tmp_path"])
     config = load_config(str(mock_config_files["specific"]))
     # Check values from specific config file
     assert config["logging"]["level"] == "WARNING"
@@ -143,9 +147,11 @@ def test_load_config_uses_specific_path(mock_config_files):
 
 def test_load_config_fallback_and_defaults(mock_config_files):
     """Test loading config falls back to example and adds defaults."""
-    os.chdir(mock_config_files["tmp_path"])
+    base_dir = str(mock_config_files["tmp_path"])
     os.remove(mock_config_files["actual"])  # Remove config.yaml
-    config = load_config(None)  # Load default (will fallback to example)
+    config = load_config(
+        None, base_dir=base_dir
+    )  # Load default (will fallback to example)
     # Check values from example config file
     assert config["logging"]["level"] == "INFO"
     assert config["web_fuzzer"]["target_url"] == "http://example.com"
@@ -156,10 +162,10 @@ def test_load_config_fallback_and_defaults(mock_config_files):
 
 def test_load_config_no_file_uses_defaults(mock_config_files):
     """Test loading config uses only defaults when no file is found."""
-    os.chdir(mock_config_files["tmp_path"])
+    base_dir = str(mock_config_files["tmp_path"])
     os.remove(mock_config_files["actual"])
     os.remove(mock_config_files["example"])
-    config = load_config(None)
+    config = load_config(None, base_dir=base_dir)
     # Check all sections have default values
     assert config["logging"]["level"] == "INFO"
     assert config["openai"]["model"] == "gpt-3.5-turbo"
@@ -171,8 +177,6 @@ def test_load_config_no_file_uses_defaults(mock_config_files):
 
 def test_load_config_env_var_override(mock_config_files):
     """Test environment variable overrides config file for OpenAI key."""
-    # Don't need to change dir, can load specific file directly
-    # os.chdir(mock_config_files["tmp_path"])
     # Set environment variable
     test_key = "env_var_key_123"
     # Use patch.dict to temporarily modify os.environ for this test only
@@ -187,7 +191,91 @@ def test_load_config_env_var_override(mock_config_files):
 
 def test_load_config_invalid_yaml(mock_config_files):
     """Test loading config raises error for invalid YAML."""
-    # Don't need to change dir
-    # os.chdir(mock_config_files["tmp_path"])
     with pytest.raises(ConfigError, match="Invalid YAML syntax"):
         load_config(str(mock_config_files["invalid"]))
+
+
+def test_load_config_writes_and_uses_cache(mock_config_files, isolated_config_cache):
+    """Test a second load is served from the on-disk cache."""
+    specific = str(mock_config_files["specific"])
+    first = load_config(specific)
+    assert isolated_config_cache.exists()
+
+    load_config.cache_clear()  # Force the on-disk cache to be consulted
+    with patch("core.config._read_config_file") as mock_read:
+        second = load_config(specific)
+        mock_read.assert_not_called()
+    assert second == first
+
+
+def test_load_config_cache_invalidated_on_change(
+    mock_config_files, isolated_config_cache
+):
+    """Test editing the YAML file invalidates the cached config."""
+    specific = mock_config_files["specific"]
+    assert load_config(str(specific))["logging"]["level"] == "WARNING"
+
+    with open(specific, "w") as f:
+        yaml.dump({"logging": {"level": "ERROR", "file": None}}, f, Dumper=SafeDumper)
+    st = os.stat(specific)
+    os.utime(specific, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert load_config(str(specific))["logging"]["level"] == "ERROR"
+
+
+def test_load_config_env_override_not_cached(mock_config_files):
+    """Test environment overrides apply on cache hits and are not persisted."""
+    specific = str(mock_config_files["specific"])
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "env_key"}, clear=True):
+        assert load_config(specific)["openai"]["api_key"] == "env_key"
+    with patch.dict(os.environ, {}, clear=True):
+        assert load_config(specific)["openai"]["api_key"] == "specific_key"
+
+
+def test_load_config_memoized_in_process(mock_config_files, isolated_config_cache):
+    """Test repeated loads reuse the in-process cache and return independent copies."""
+    specific = str(mock_config_files["specific"])
+    first = load_config(specific)
+    first["logging"]["level"] = "CRITICAL"  # Mutating a result must not leak
+
+    with patch("core.config._read_cached_config") as mock_disk:
+        second = load_config(specific)
+        mock_disk.assert_not_called()
+    assert second["logging"]["level"] == "WARNING"
+
+
+def test_load_config_cache_entry_is_read_only(mock_config_files):
+    """Test the shared in-process cache entry cannot be modified."""
+    specific = str(mock_config_files["specific"])
+    cache_key = core.config._config_cache_key(specific, os.stat(specific))
+    cached = core.config._load_config_cached(cache_key)
+    with pytest.raises(TypeError):
+        cached["logging"] = {}
+    assert load_config(specific)["logging"]["level"] == "WARNING"
+
+
+def test_load_config_null_section_gets_defaults(tmp_path):
+    """Test an empty (null) section in YAML is filled with defaults."""
+    config_path = tmp_path / "null_section.yaml"
+    config_path.write_text("esxi_tester:\nlogging:\n  level: ERROR\n")
+    config = load_config(str(config_path))
+    assert config["esxi_tester"]["targets"] == []
+    assert config["esxi_tester"]["check_timeout"] == 10
+    assert config["logging"]["level"] == "ERROR"
+    assert config["logging"]["file"] == "lahma.log"
+    # Defaults must never be shared between loaded configs
+    config["esxi_tester"]["targets"].append("10.0.0.1")
+    assert core.config._DEFAULTS["esxi_tester"]["targets"] == []
+
+
+def test_load_config_env_var_precedence(mock_config_files):
+    """Test LAHMA_-prefixed variables win and other secrets are overridable."""
+    env = {
+        "LAHMA_OPENAI_API_KEY": "lahma_key",
+        "OPENAI_API_KEY": "generic_key",
+        "LAHMA_TOR_CONTROL_PASSWORD": "tor_secret",
+    }
+    with patch.dict(os.environ, env, clear=True):
+        config = load_config(str(mock_config_files["specific"]))
+    assert config["openai"]["api_key"] == "lahma_key"
+    assert config["tor"]["control_password"] == "tor_secret"
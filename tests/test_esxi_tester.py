@@ -0,0 +1,176 @@
+import json
+import socket
+import sys
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+# Importing works without pyVmomi; only running the checks requires it
+import modules.esxi_tester as esxi_tester
+from modules.esxi_tester import _first_open_address, _parse_target, _resolve_host
+
+# --- Fixtures (Helper functions/data for tests) ---
+
+_real_getaddrinfo = socket.getaddrinfo
+
+
+def _fake_getaddrinfo(*addresses):
+    """Returns a getaddrinfo stand-in resolving 'esxi.test' to `addresses` in order."""
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host != "esxi.test":
+            return _real_getaddrinfo(host, port, *args, **kwargs)
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port or 0))
+            for address in addresses
+        ]
+
+    return getaddrinfo
+
+
+@pytest.fixture(autouse=True)
+def isolated_resolver_cache():
+    """Clears the cached host lookups around each test."""
+    _resolve_host.cache_clear()
+    yield
+    _resolve_host.cache_clear()
+
+
+@pytest.fixture
+def listener():
+    """A TCP socket listening on 127.0.0.1 (only). Yields its port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        sock.listen()
+        yield sock.getsockname()[1]
+
+
+# --- Test Cases ---
+
+
+@pytest.mark.parametrize(
+    "target_entry, expected",
+    [
+        ("esxi.local", ("esxi.local", 443)),  # Default HTTPS port
+        ("10.0.0.1:8443", ("10.0.0.1", 8443)),
+        (" 10.0.0.1:65535 ", ("10.0.0.1", 65535)),  # Surrounding spaces ignored
+        ("[fe80::1]", ("fe80::1", 443)),
+        ("[fe80::1]:902", ("fe80::1", 902)),
+    ],
+)
+def test_parse_target_valid(target_entry, expected):
+    """Test valid target entries are split into host and port."""
+    assert _parse_target(target_entry) == expected
+
+
+@pytest.mark.parametrize(
+    "target_entry",
+    [
+        "10.0.0.1:0",
+        "10.0.0.1:99999",  # Would wrap to 34463 in getaddrinfo
+        "10.0.0.1:https",
+        "fe80::1:443",  # IPv6 with a port needs brackets
+        "",
+    ],
+)
+def test_parse_target_invalid(target_entry):
+    """Test malformed entries and out-of-range ports are rejected."""
+    assert _parse_target(target_entry) is None
+
+
+def test_resolve_host_keeps_all_addresses():
+    """Test every resolved address is kept, in order and without duplicates."""
+    fake = _fake_getaddrinfo("10.0.0.2", "10.0.0.1", "10.0.0.2")
+    with patch("socket.getaddrinfo", side_effect=fake) as mock_getaddrinfo:
+        assert _resolve_host("esxi.test") == ("10.0.0.2", "10.0.0.1")
+        assert _resolve_host("esxi.test") == ("10.0.0.2", "10.0.0.1")
+    mock_getaddrinfo.assert_called_once()  # Second lookup served from the cache
+
+
+@pytest.mark.skipif(
+    sys.platform != "linux", reason="needs the whole 127.0.0.0/8 on loopback"
+)
+def test_first_open_address_skips_refusing_address(listener):
+    """Test a host whose first address refuses is still reached on the next one."""
+    fake = _fake_getaddrinfo("127.0.0.2", "127.0.0.1")  # Only .1 is listening
+    with patch("socket.getaddrinfo", side_effect=fake):
+        addresses = _resolve_host("esxi.test")
+        assert _first_open_address(addresses, listener, 2) == ("127.0.0.1", "")
+
+
+def test_first_open_address_all_refuse():
+    """Test the last failure reason is reported when no address answers."""
+    reasons = {"10.0.0.1": "timed out", "10.0.0.2": "ConnectionRefusedError"}
+    with patch.object(
+        esxi_tester, "_tcp_probe", side_effect=lambda a, p, t: (False, reasons[a])
+    ):
+        result = _first_open_address(("10.0.0.1", "10.0.0.2"), 443, 1)
+    assert result == (None, "ConnectionRefusedError")
+
+
+@pytest.mark.skipif(
+    not esxi_tester.PYVMOMI_AVAILABLE, reason="pyVmomi is not installed"
+)
+def test_check_esxi_target_connects_to_answering_address():
+    """Test SmartConnect is given the address that accepted the TCP probe."""
+    fake = _fake_getaddrinfo("10.0.0.2", "10.0.0.1")
+    open_ports = {"10.0.0.1": (True, ""), "10.0.0.2": (False, "refused")}
+    mock_connect = MagicMock()
+    mock_connect.SmartConnect.return_value.RetrieveContent.return_value.about = (
+        MagicMock(version="8.0.2", fullName="VMware ESXi", apiVersion="8.0.2.0")
+    )
+    with patch("socket.getaddrinfo", side_effect=fake), patch.object(
+        esxi_tester, "_tcp_probe", side_effect=lambda a, p, t: open_ports[a]
+    ), patch.object(esxi_tester, "connect", mock_connect):
+        success, message = esxi_tester.check_esxi_target("esxi.test", 443, 2)
+    assert success, message
+    assert "Version: 8.0.2" in message
+    assert mock_connect.SmartConnect.call_args.kwargs["host"] == "10.0.0.1"
+
+
+def test_run_results_follow_configured_target_order(tmp_path, monkeypatch):
+    """Test run() reports invalid, unresolvable and checked targets in config order."""
+    results_path = tmp_path / "results.jsonl"
+    targets = [
+        "slow.test",
+        "10.0.0.1:99999",
+        "dns-fail.test",
+        "fast.test:8443",
+        "boom.test",
+    ]
+
+    def fake_getaddrinfo(host, port, *args, **kwargs):
+        if host == "dns-fail.test":
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.9", port or 0))]
+
+    def fake_check(host, port, timeout, addresses=None):
+        if host == "boom.test":
+            raise RuntimeError("probe crashed")
+        if host == "slow.test":
+            time.sleep(0.1)  # Finishes last, but must still be reported first
+        return True, f"Successfully connected to {host}:{port}"
+
+    monkeypatch.setattr(esxi_tester, "PYVMOMI_AVAILABLE", True)
+    monkeypatch.setattr(esxi_tester, "_load_pyvmomi", lambda: None)
+    monkeypatch.setattr(esxi_tester, "check_esxi_target", fake_check)
+    monkeypatch.setattr(socket, "getaddrinfo", fake_getaddrinfo)
+
+    esxi_tester.run(
+        {
+            "esxi_tester": {
+                "targets": targets,
+                "check_timeout": 1,
+                "results_file": str(results_path),
+            }
+        }
+    )
+
+    records = [json.loads(line) for line in results_path.read_text().splitlines()]
+    assert [r["target"] for r in records] == targets
+    assert [r["success"] for r in records] == [True, False, False, True, False]
+    assert records[1]["message"].startswith("Invalid format")
+    assert records[2]["message"].startswith("DNS resolution error")
+    assert records[3]["message"] == "Successfully connected to fast.test:8443"
+    assert records[4]["message"] == "Critical unexpected error: probe crashed"
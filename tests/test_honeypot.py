@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import patch
+
+# Importing works without the OpenAI SDK; only API-key generation requires it
+import modules.honeypot as honeypot
+from modules.honeypot import generate_bait_rules
+
+# --- Fixtures (Helper functions/data for tests) ---
+
+GENERATED_RULES = [
+    {"rule_id": "rule_001", "type": "banner_grab", "ports": [22, 2222]},
+]
+
+
+@pytest.fixture(autouse=True)
+def isolated_rule_cache():
+    """Empties the in-process bait rule cache around each test."""
+    honeypot._rule_cache.clear()
+    yield
+    honeypot._rule_cache.clear()
+
+
+@pytest.fixture
+def mock_generate():
+    """Replaces the (slow, API-backed) rule generation with a fixed rule list."""
+    with patch.object(
+        honeypot, "_generate_bait_rules", return_value=GENERATED_RULES
+    ) as mock:
+        yield mock
+
+
+# --- Test Cases ---
+
+
+def test_generate_bait_rules_cached(mock_generate):
+    """Test rules are generated once per target/key/model and then served from cache."""
+    first = generate_bait_rules("ssh", "sk-test", "gpt-3.5-turbo")
+    second = generate_bait_rules("ssh", "sk-test", "gpt-3.5-turbo")
+    assert first == second == GENERATED_RULES
+    mock_generate.assert_called_once_with("ssh", "sk-test", "gpt-3.5-turbo")
+
+
+def test_generate_bait_rules_returns_copies(mock_generate):
+    """Test mutating returned rules (including nested values) leaves the cache intact."""
+    first = generate_bait_rules("ssh", None, "gpt-3.5-turbo")
+    first[0]["ports"].append(8022)
+    first[0]["rule_id"] = "changed"
+    first.append({"rule_id": "extra"})
+
+    second = generate_bait_rules("ssh", None, "gpt-3.5-turbo")
+    assert second == GENERATED_RULES
+    assert GENERATED_RULES[0]["ports"] == [22, 2222]  # Generator's list untouched
+
+
+def test_generate_bait_rules_cache_keyed_by_model(mock_generate):
+    """Test a different model (or API key) does not reuse cached rules."""
+    generate_bait_rules("ssh", "sk-test", "gpt-3.5-turbo")
+    generate_bait_rules("ssh", "sk-test", "gpt-4")
+    generate_bait_rules("ssh", "sk-other", "gpt-4")
+    assert mock_generate.call_count == 3
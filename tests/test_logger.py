@@ -0,0 +1,60 @@
+import logging
+import os
+
+import pytest
+
+# Import the function to test from core.logger
+from core.logger import setup_logging
+
+# --- Fixtures (Helper functions/data for tests) ---
+
+# Relative to the project root, in a directory that does not exist there
+MISSING_DIR_LOG = os.path.join("no-such-log-dir", "lahma.log")
+
+
+@pytest.fixture(autouse=True)
+def restore_root_logger():
+    """Puts back the root logger's handlers and level after setup_logging replaced them."""
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    yield root
+    for handler in root.handlers:
+        if handler not in saved_handlers:
+            handler.close()
+    root.handlers[:] = saved_handlers
+    root.setLevel(saved_level)
+
+
+# --- Test Cases ---
+
+
+def test_setup_logging_falls_back_to_home(tmp_path, monkeypatch, restore_root_logger):
+    """Test an unwritable project log path falls back to the same file name in HOME."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    log_file_path = setup_logging("INFO", MISSING_DIR_LOG)
+
+    assert log_file_path == str(tmp_path / "lahma.log")
+    file_handlers = [
+        h for h in restore_root_logger.handlers if isinstance(h, logging.FileHandler)
+    ]
+    assert [h.baseFilename for h in file_handlers] == [log_file_path]
+
+
+def test_setup_logging_console_only_when_no_file_works(
+    tmp_path, monkeypatch, restore_root_logger
+):
+    """Test logging still works, console only, when neither log file can be opened."""
+    monkeypatch.setenv("HOME", str(tmp_path / "missing-home"))
+    log_file_path = setup_logging("INFO", MISSING_DIR_LOG)
+
+    assert log_file_path is None
+    handlers = restore_root_logger.handlers
+    assert len(handlers) == 1
+    assert type(handlers[0]) is logging.StreamHandler  # Not a FileHandler
+
+
+def test_setup_logging_console_only_when_no_file_name(restore_root_logger):
+    """Test a None log file name configures console logging only."""
+    assert setup_logging("DEBUG", None) is None
+    assert [type(h) for h in restore_root_logger.handlers] == [logging.StreamHandler]
+    assert restore_root_logger.level == logging.DEBUG
@@ -0,0 +1,214 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+# Import the functions/classes to test from the web fuzzer module
+from modules.web_fuzzer import (
+    WebFuzzerConfig,
+    _collect_findings,
+    _new_findings,
+    _read_line_batches,
+    run_nuclei_batch,
+)
+from core.exceptions import ConfigError, WebFuzzerError
+
+# --- Helpers ---
+
+
+def _feed(*chunks: bytes) -> asyncio.StreamReader:
+    """Returns a StreamReader that yields `chunks` and then EOF (call inside a loop)."""
+    stream = asyncio.StreamReader()
+    for chunk in chunks:
+        stream.feed_data(chunk)
+    stream.feed_eof()
+    return stream
+
+
+def collect(*chunks: bytes):
+    """Runs _collect_findings over the given stdout chunks. Returns (findings, count)."""
+
+    async def _run():
+        findings = _new_findings()
+        count = await _collect_findings(_feed(*chunks), findings)
+        return findings, count
+
+    return asyncio.run(_run())
+
+
+def read_batches(*chunks: bytes):
+    """Returns the line batches _read_line_batches yields for the given chunks."""
+
+    async def _run():
+        return [lines async for lines in _read_line_batches(_feed(*chunks))]
+
+    return asyncio.run(_run())
+
+
+# Stand-in for the nuclei executable. It records its PID, then behaves as
+# selected by FAKE_NUCLEI_MODE: "ok" reports one finding per stdin target,
+# "fail" exits 3 and "hang" never finishes.
+FAKE_NUCLEI = """#!/bin/sh
+echo $$ > "$FAKE_NUCLEI_PIDFILE"
+case "$FAKE_NUCLEI_MODE" in
+  fail) cat >/dev/null; echo "[ERR] could not load templates" >&2; exit 3 ;;
+  hang) exec sleep 60 ;;
+esac
+while read -r url; do
+  printf '{"template-id":"tech-detect","host":"%s","info":{"severity":"low"}}\\n' "$url"
+done
+"""
+
+
+@pytest.fixture
+def fake_nuclei(tmp_path, monkeypatch):
+    """Puts a stub nuclei first on PATH. Returns a function giving the PID it ran as."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "nuclei"
+    script.write_text(FAKE_NUCLEI)
+    script.chmod(0o755)
+    pid_file = tmp_path / "nuclei.pid"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_NUCLEI_PIDFILE", str(pid_file))
+    monkeypatch.setenv("FAKE_NUCLEI_MODE", "ok")
+    return lambda: int(pid_file.read_text())
+
+
+def assert_reaped(pid: int) -> None:
+    """Asserts the process is neither running nor left as a zombie."""
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+
+
+def scan(*target_urls: str, process_timeout: int = 10):
+    """Runs run_nuclei_batch over the given targets with default settings."""
+    return asyncio.run(run_nuclei_batch(list(target_urls), None, "", process_timeout))
+
+
+# --- Test Cases ---
+
+
+def test_read_line_batches_joins_partial_lines():
+    """Test a line split across reads is yielded once, complete."""
+    stream_chunks = (b"first\nsec", b"ond\nthi", b"rd")
+    lines = [line for batch in read_batches(*stream_chunks) for line in batch]
+    assert lines == [b"first", b"second", b"third"]
+
+
+def test_collect_findings_parses_jsonl():
+    """Test JSONL records are stored column-wise with severity codes."""
+    findings, count = collect(
+        b'{"template-id":"a","host":"http://x","info":{"severity":"High"}}\n'
+        b'{"template-id":"b","host":"http://y","info":{"severity":"info"}}\n'
+    )
+    assert count == 2
+    assert findings["template_id"] == ["a", "b"]
+    assert findings["host"] == ["http://x", "http://y"]
+    assert list(findings["severity"]) == [4, 1]  # high, info
+    assert findings["info"][0] == {"severity": "High"}
+
+
+def test_collect_findings_record_split_across_chunks():
+    """Test a JSON record split across stdout reads is still parsed."""
+    findings, count = collect(b'{"template-id":"a","ho', b'st":"http://x","info":{}}\n')
+    assert count == 1
+    assert findings["template_id"] == ["a"]
+    assert findings["host"] == ["http://x"]
+
+
+def test_collect_findings_skips_non_json_lines():
+    """Test plain-text and non-object lines are counted but not stored as findings."""
+    findings, count = collect(
+        b"[INF] Loading templates\n",
+        b"\n[1, 2]\n",
+        b'{"template-id":"a","host":"http://x"}\n',
+    )
+    assert count == 3  # Blank lines are not counted
+    assert findings["template_id"] == ["a"]
+    assert list(findings["severity"]) == [0]  # No info -> unknown
+
+
+def test_collect_findings_non_dict_info():
+    """Test a record whose 'info' is not an object gets an empty info dict."""
+    findings, _ = collect(b'{"template-id":"x","host":"http://x","info":"oops"}\n')
+    assert findings["info"] == [{}]
+    assert list(findings["severity"]) == [0]
+
+
+def test_config_from_dict_merges_targets():
+    """Test target_url is scanned first, in the same batch as target_urls."""
+    cfg = WebFuzzerConfig.from_dict(
+        {
+            "web_fuzzer": {
+                "target_url": "http://a",
+                "target_urls": ["http://b"],
+                "nuclei": {"process_timeout": 30, "concurrency": 4},
+            }
+        }
+    )
+    assert cfg.target_urls == ("http://a", "http://b")
+    assert cfg.process_timeout == 30
+    assert cfg.concurrency == 4
+    assert cfg.extra_flags == ""  # Default
+
+
+def test_config_from_dict_missing_target():
+    """Test a config without any target URL raises ConfigError."""
+    with pytest.raises(ConfigError, match="target_url"):
+        WebFuzzerConfig.from_dict({"web_fuzzer": {}})
+
+
+@pytest.mark.parametrize(
+    "web_fuzzer_config, setting",
+    [
+        ({"target_urls": "http://ab"}, "target_urls"),
+        ({"target_url": "http://a", "nuclei": {"concurrency": "eight"}}, "concurrency"),
+        ({"target_url": "http://a", "nuclei": {"concurrency": True}}, "concurrency"),
+        (
+            {"target_url": "http://a", "nuclei": {"process_timeout": 0}},
+            "process_timeout",
+        ),
+    ],
+)
+def test_config_from_dict_rejects_bad_types(web_fuzzer_config, setting):
+    """Test settings of the wrong type raise ConfigError naming the setting."""
+    with pytest.raises(ConfigError, match=setting):
+        WebFuzzerConfig.from_dict({"web_fuzzer": web_fuzzer_config})
+
+
+skip_without_sh = pytest.mark.skipif(
+    sys.platform == "win32", reason="the stub nuclei is a shell script"
+)
+
+
+@skip_without_sh
+def test_run_nuclei_batch_feeds_targets_on_stdin(fake_nuclei):
+    """Test targets written to Nuclei's stdin come back as findings."""
+    findings = scan("http://a.test", "http://b.test")
+    assert findings["host"] == ["http://a.test", "http://b.test"]
+    assert findings["template_id"] == ["tech-detect", "tech-detect"]
+    assert list(findings["severity"]) == [2, 2]  # low
+    assert_reaped(fake_nuclei())
+
+
+@skip_without_sh
+def test_run_nuclei_batch_nonzero_exit(fake_nuclei, monkeypatch):
+    """Test a non-zero Nuclei exit status raises WebFuzzerError."""
+    monkeypatch.setenv("FAKE_NUCLEI_MODE", "fail")
+    with pytest.raises(WebFuzzerError, match="exit code 3"):
+        scan("http://a.test")
+    assert_reaped(fake_nuclei())
+
+
+@skip_without_sh
+def test_run_nuclei_batch_timeout_kills_nuclei(fake_nuclei, monkeypatch):
+    """Test a hanging Nuclei is killed once process_timeout expires."""
+    monkeypatch.setenv("FAKE_NUCLEI_MODE", "hang")
+    started = time.monotonic()
+    with pytest.raises(WebFuzzerError, match="timed out"):
+        scan("http://a.test", process_timeout=1)
+    assert time.monotonic() - started < 5  # Not the stub's 60s
+    assert_reaped(fake_nuclei())